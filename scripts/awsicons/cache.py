@@ -0,0 +1,153 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Content-addressed cache of generated icon files
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# Bump when the cache layout or key contents change
+CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = ".build-cache"
+# Stored next to the output files, holds anything else the worker returns
+DATA_FILENAME = ".data.json"
+
+# Builder sources that change generated output, hashed into every key. This
+# includes svg.py for the cached Mermaid bodies and icon-builder.py, whose
+# worker() shapes the cached files.
+BUILDER_SOURCES = [
+    Path(__file__).parent / "icon.py",
+    Path(__file__).parent / "png.py",
+    Path(__file__).parent / "rasterizer.py",
+    Path(__file__).parent / "sprite.py",
+    Path(__file__).parent / "svg.py",
+    Path(__file__).parent / "jvm_daemon.js",
+    Path(__file__).parent.parent / "icon-builder.py",
+]
+
+# Icon attributes that determine the generated files
+ICON_ATTRIBUTES = [
+    "source_name",
+    "category",
+    "target",
+    "target2",
+    "color",
+    "transparency",
+    "target_size",
+    "skip_icon",
+    "group",
+    "group_border_style",
+    "group_alignment",
+    "group_label",
+]
+
+
+def jar_stamps(path):
+    """Returns [[name, size, mtime_ns], ...] of the jar at path or the jars under
+    it, for tool_versions, so a replaced or missing jar changes every key
+    without reading it. An empty list when nothing is there.
+
+    :param path: jar file or directory
+    :type path: str
+    """
+    path = Path(path)
+    jars = sorted(path.rglob("*.jar")) if path.is_dir() else [path]
+    stamps = []
+    for jar in jars:
+        try:
+            stat = jar.stat()
+        except OSError:
+            continue
+        stamps.append([jar.as_posix(), stat.st_size, stat.st_mtime_ns])
+    return stamps
+
+
+class BuildCache:
+    """Generated files for each icon, stored under a hash of everything that produced them
+
+    An entry is a directory named after the key holding the icon's output files
+    (e.g. ``EC2.png`` and ``EC2.puml``) and optional JSON data. Entries are written to a temporary
+    directory and renamed into place, so concurrent workers never see a partial
+    entry.
+
+    :param path: cache directory
+    :type path: str
+    :param tool_versions: anything else that changes output, e.g. jar_stamps() of the jars
+    :type tool_versions: dict
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, tool_versions=None):
+        self.path = Path(path)
+        digest = hashlib.sha256(str(CACHE_VERSION).encode())
+        digest.update(json.dumps(tool_versions or {}, sort_keys=True).encode())
+        for source in BUILDER_SOURCES:
+            digest.update(source.read_bytes())
+        self.tools_digest = digest.hexdigest()
+
+    def key(self, icon):
+        """Returns the cache key for an icon from its source files and resolved attributes"""
+        digest = hashlib.sha256(self.tools_digest.encode())
+        attributes = {name: getattr(icon, name) for name in ICON_ATTRIBUTES}
+        attributes["dark"] = icon.filename_dark is not None
+        digest.update(json.dumps(attributes, sort_keys=True, default=str).encode())
+        for filename in (icon.filename, icon.filename_dark):
+            if filename is not None:
+                with open(filename, "rb") as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()
+
+    def files_key(self, files, extra=""):
+        """Returns the cache key for output built from files, e.g. a category's all.puml
+
+        :param files: input files, their names and contents are hashed in the order given
+        :type files: list
+        :param extra: anything else that changes the output
+        :type extra: str
+        """
+        digest = hashlib.sha256(self.tools_digest.encode())
+        digest.update(extra.encode("utf-8"))
+        for filename in files:
+            digest.update(Path(filename).name.encode("utf-8") + b"\0")
+            with open(filename, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return self.path / key[:2] / key
+
+    def has(self, key):
+        """Returns True if an entry is stored under key"""
+        return self._entry(key).is_dir()
+
+    def restore(self, key):
+        """Returns (dict of filename -> bytes, data) for a cached entry, or None on a miss"""
+        entry = self._entry(key)
+        try:
+            files = {f.name: f.read_bytes() for f in sorted(entry.iterdir())}
+        except FileNotFoundError:
+            return None
+        data = files.pop(DATA_FILENAME, None)
+        return (files, json.loads(data) if data is not None else None)
+
+    def store(self, key, files, data=None):
+        """Store a dict of filename -> bytes, and optional JSON serializable data, under key"""
+        entry = self._entry(key)
+        if entry.exists():
+            return
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=entry.parent, prefix=".tmp-")
+        if data is not None:
+            files = {**files, DATA_FILENAME: json.dumps(data).encode("utf-8")}
+        for name, contents in files.items():
+            with open(os.path.join(temp_dir, name), "wb") as f:
+                f.write(contents)
+        try:
+            os.rename(temp_dir, entry)
+        except OSError:
+            # another worker stored the same entry first
+            shutil.rmtree(temp_dir, ignore_errors=True)
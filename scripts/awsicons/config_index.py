@@ -0,0 +1,87 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Lookup index over the config.yml Categories shared by all icons
+"""
+
+import sys
+
+
+class ConfigIndex:
+    """Icon entries from config.yml keyed by (category, Source)
+
+    Built once from the loaded config so each icon resolves its entry, color
+    and group settings in constant time instead of scanning every category.
+    Resolved colors are cached per category and per color name.
+
+    :param config: loaded config.yml
+    :type config: dict
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.entries = {}
+        try:
+            for category, values in config["Categories"].items():
+                for entry in values["Icons"]:
+                    # first entry wins, same as the previous sequential scan
+                    self.entries.setdefault((category, entry["Source"]), entry)
+        except (KeyError, TypeError, AttributeError) as e:
+            print(f"Error: {e}")
+            print(
+                "config.yml requires minimal config section, please see documentation"
+            )
+            sys.exit(1)
+        self._colors = {}
+        self._category_colors = {}
+
+    def lookup(self, category, source_name):
+        """Returns the config entry for a source file in a category, or None"""
+        return self.entries.get((category, source_name))
+
+    def color(self, category, entry):
+        """Returns the color for an entry from the icon, category, or default, or None if not set"""
+        if "Color" in entry:
+            if entry["Color"].startswith("#") or entry["Color"].startswith("$"):
+                return entry["Color"]
+            return self.color_name(entry["Color"])
+        if category not in self._category_colors:
+            if "Color" in self.config["Categories"][category]:
+                color = self.color_name(self.config["Categories"][category]["Color"])
+            elif "Color" in self.config["Defaults"]["Category"]:
+                color = self.color_name(self.config["Defaults"]["Category"]["Color"])
+            else:
+                color = None
+            self._category_colors[category] = color
+        return self._category_colors[category]
+
+    def color_name(self, color_name):
+        """Returns hex color for provided name from config Defaults"""
+        if color_name not in self._colors:
+            try:
+                colors = self.config["Defaults"]["Colors"]
+            except KeyError as e:
+                print(f"Error: {e}")
+                print(
+                    "config.yml requires minimal config section, please see documentation"
+                )
+                sys.exit(1)
+            if color_name in colors:
+                self._colors[color_name] = colors[color_name]
+            else:
+                print(
+                    f"ERROR: Color {color_name} not found in default color list, returning $AWS_FG_COLOR"
+                )
+                self._colors[color_name] = "$AWS_FG_COLOR"
+        return self._colors[color_name]
+
+    def group_value(self, key, entry):
+        """Returns a group setting from the entry, then Defaults->Group, or None"""
+        if "Group" in entry and key in entry["Group"]:
+            return entry["Group"][key]
+        if (
+            "Group" in self.config["Defaults"]
+            and key in self.config["Defaults"]["Group"]
+        ):
+            return self.config["Defaults"]["Group"][key]
+        return None
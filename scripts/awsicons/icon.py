@@ -5,21 +5,58 @@ Modules to support creation of PlantUML icon files
 """
 
 import base64
+import io
 import re
-import shutil
 import subprocess
 import sys
 import tempfile
 from subprocess import PIPE
 
+from awsicons.config_index import ConfigIndex
+from awsicons.jvm import DaemonError
+from awsicons.rasterizer import get_rasterizer
+from awsicons.sprite import PLANTUML_JAR, encode_sprite, get_sprite_encoder
+from awsicons.svg import mermaid_body, parse_svg
 from lxml import etree
-from PIL import Image, ImageOps
+from PIL import Image, ImageColor, ImageOps
+
+SVG_NS = {"s": "http://www.w3.org/2000/svg"}
+GRADIENT_XPATH = '//*[@fill="url(#linearGradient-1)"]'
 
 PUML_LICENSE_HEADER = """' Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
 ' SPDX-License-Identifier: CC-BY-ND-2.0 (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
 """
 
 
+class IconTask:
+    """Fields of an Icon needed to generate its files, sent to Pool workers
+
+    Icons carry the whole config.yml, so workers receive this slim record instead
+    and rebuild an Icon from it with Icon.from_task().
+    """
+
+    __slots__ = (
+        "filename",
+        "filename_dark",
+        "source_name",
+        "category",
+        "target",
+        "target2",
+        "color",
+        "target_size",
+        "transparency",
+        "skip_icon",
+        "group",
+        "group_border_style",
+        "group_alignment",
+        "group_label",
+    )
+
+    def __init__(self, icon):
+        for field in self.__slots__:
+            setattr(self, field, getattr(icon, field))
+
+
 class Icon:
     """Reference to source SVG or PNG and methods to create the PUML icons"""
 
@@ -32,6 +69,7 @@ class Icon:
         category_mappings=None,
         filename_mappings=None,
         filename_mappings2=None,
+        config_index=None,
     ):
 
         # Full path and filename as PosixPath
@@ -83,160 +121,183 @@ class Icon:
                 filename=str(self.filename),
                 mappings=self.category_mappings,
             )
-            self._set_values(self.source_name, self.temp_category)
-
-    def crop_category_image(self, image_filename, png_filename):
-        """Copy 72x72 category image and add 2px border"""
+            if config_index is None:
+                config_index = ConfigIndex(self.config)
+            self._set_values(self.source_name, self.temp_category, config_index)
+
+    def task(self):
+        """Returns the IconTask to send to a Pool worker for this icon"""
+        return IconTask(self)
+
+    @classmethod
+    def from_task(cls, task):
+        """Returns an Icon with the values of an IconTask, without config"""
+        icon = cls()
+        for field in IconTask.__slots__:
+            setattr(icon, field, getattr(task, field))
+        return icon
+
+    def crop_category_image(self, image_filename):
+        """Crop 72x72 category image, add 2px border and return the PNG bytes"""
         with Image.open(image_filename) as img:
             # should be 72x72
             width, height = img.size  # pylint: disable=unused-variable
             png_img = img.crop((7, 7, 67, 67))
-            ImageOps.expand(png_img, border=2, fill="#879196").save(png_filename)
+            buffer = io.BytesIO()
+            ImageOps.expand(png_img, border=2, fill="#879196").save(
+                buffer, format="PNG"
+            )
+        return buffer.getvalue()
 
     def generate_image(
         self,
-        path,
         color=None,
         max_target_size=64,
         transparency=False,
         gradient=True,
         image_filename=None,
-        dark=False,
-        batik=True,
+        rasterizer="batik",
     ):
-        """Create image from SVG file and save full color without transparency to path"""
+        """Create image from SVG file and return the PNG bytes, full color without transparency
+        unless set"""
 
         if image_filename is None:
             image_filename = self.filename
-        png_filename = self.target
-        if dark:
-            png_filename = png_filename + "_Dark"
 
-        # copy file to another location
+        # PNG sources are used as is
         if str(image_filename).endswith(".png"):
-            print(f"Copying {image_filename} to {str(path)}/{png_filename}.png")
+            print(f"Copying {image_filename}")
 
             if str(self.source_name).startswith("Arch-Category"):
-                self.crop_category_image(
-                    image_filename, f"{str(path)}/{png_filename}.png"
-                )
-            else:
-                shutil.copyfile(image_filename, f"{str(path)}/{png_filename}.png")
-            return
+                return self.crop_category_image(image_filename)
+            with open(image_filename, "rb") as png_file:
+                return png_file.read()
 
         # PlantUML only supports 16 layers of gray causing banding when applying to the
         # resource and category icons that have a finer gradient applied. This needs to be replaced
         # with a constant background color for the source PNG file before conversion to sprites.
 
         # Parse for id's that indicate service or category and replace with color fill.
-        # If id is for a resource, no changes needed. Save to a temp SVG file.
-
-        ns = {"s": "http://www.w3.org/2000/svg"}
-        white_rect = etree.Element("rect", width="100%", height="100%", fill="white")
-        color_rect = etree.Element(
-            "rect", width="100%", height="100%", fill=f"{self.color}"
-        )
-        parser = etree.XMLParser(remove_blank_text=True)
-
-        root = etree.parse(str(image_filename), parser)
+        # If id is for a resource, no changes needed. The modified tree is rasterized from memory.
+        root = parse_svg(image_filename)
 
         if gradient is True:
             # Replace any gradient fills with the requisite color
             # This was in effect for 2021.01.31 Category icons
-            elements = root.xpath('//*[@fill="url(#linearGradient-1)"]')
-            for elem in elements:
+            for elem in root.xpath(GRADIENT_XPATH):
                 elem.attrib["fill"] = self.color
 
         if transparency is False:
-            # For resource or category icons which are transparent, set fill to white
-            # TODO - can we query without namespaces?
-            elem = root.xpath(
-                '//s:g[starts-with(@id, "Icon-Resource")]',
-                namespaces=ns,
-            )
-            if elem:
-                # To set fill, add a rect before any of the paths.
-                elem[0].insert(0, white_rect)
-            # For category icons, set fill to category color
-            elem = root.xpath(
-                '//s:g[starts-with(@id, "Icon-Architecture-Category")]',
-                namespaces=ns,
-            )
-            if elem:
+            for group, fill in self._background_fills(root):
                 # To set fill, add a rect before any of the paths.
-                elem[0].insert(0, color_rect)
-
-        # Generate PNG from the modified SVG
-        # The SVG files for services use a gradient fill that comes out as gray stepping otherwise
-        try:
-            # Create temporary SVG file with etree
-            svg_temp = tempfile.NamedTemporaryFile()
-            svg_temp.write(etree.tostring(root))
-            svg_temp.flush()
-            if batik:
-                # https://xmlgraphics.apache.org/batik/tools/rasterizer.html
-                subprocess.run(
-                    [
-                        "java",
-                        "-jar",
-                        "-Djava.awt.headless=true",
-                        "batik-1.16/batik-rasterizer-1.16.jar",
-                        "-d",
-                        f"{str(path)}/{png_filename}.png",
-                        "-w",
-                        str(max_target_size),
-                        "-h",
-                        str(max_target_size),
-                        "-m",
-                        "image/png",
-                        svg_temp.name,
-                    ],
-                    shell=False,
-                    stdout=PIPE,
-                    stderr=PIPE,
+                group.insert(
+                    0, etree.Element("rect", width="100%", height="100%", fill=fill)
                 )
-            else:
-                # Use rsvg-convert (librsvg) instead of Batik (experimental)
-                subprocess.run(
-                    [
-                        "rsvg-convert",
-                        "-w",
-                        str(max_target_size),
-                        "-h",
-                        str(max_target_size),
-                        "-o",
-                        f"{str(path)}/{png_filename}.png",
-                        svg_temp.name,
-                    ],
-                    shell=False,
-                    stdout=PIPE,
-                    stderr=PIPE,
+
+        return self._rasterize(root, image_filename, max_target_size, rasterizer)
+
+    def generate_images(
+        self,
+        color,
+        max_target_size,
+        transparency,
+        gradient,
+        rasterizer="batik",
+    ):
+        """Create the icon's PNG and dark mode PNG if set, returns dict of filename -> PNG bytes"""
+        images = {}
+        for suffix, image_filename in (
+            ("", self.filename),
+            ("_Dark", self.filename_dark),
+        ):
+            if image_filename is not None:
+                images[f"{self.target}{suffix}.png"] = self.generate_image(
+                    color,
+                    max_target_size,
+                    transparency,
+                    gradient,
+                    image_filename,
+                    rasterizer=rasterizer,
                 )
-            svg_temp.close()
-        except Exception as e:  # pylint: disable=broad-except
-            print(
-                f"Error executing {'batik-rasterizer' if batik else 'rsvg-convert'}, {e}"
-            )
-            sys.exit(1)
-        return
+        return images
 
-    def generate_images(self, path, color, max_target_size, transparency, gradient):
-        self.generate_image(
-            path, color, max_target_size, transparency, gradient, self.filename
-        )
+    def generate_sprite_and_images(self, max_target_size=64, rasterizer="batik"):
+        """Create the PNG used for the sprite and the icon's images, from one render when possible
+
+        The sprite PNG is rendered without transparency and with gradients filled,
+        the images with the icon's transparency. When the SVG has no gradient to
+        fill, the two only differ by the background rect inserted behind an
+        opaque icon, so the icon is rendered once and the sprite PNG is that render
+        composited onto the background color.
+
+        :return: (sprite PNG bytes, dict of filename -> PNG bytes)
+        :rtype: tuple
+        """
+        if not str(self.filename).endswith(".svg"):
+            # PNG sources are copied the same way for the sprite and the image
+            images = self.generate_images(
+                True, max_target_size, self.transparency, False, rasterizer
+            )
+            return images[f"{self.target}.png"], images
+        root = parse_svg(self.filename)
+        backgrounds = self._background_fills(root)
+        if root.xpath(GRADIENT_XPATH) or (self.transparency and len(backgrounds) > 1):
+            # gradients are only filled for the sprite, and rects in more than one
+            # group don't reduce to a single background
+            return self._render_sprite_and_images(max_target_size, rasterizer)
+
+        if not self.transparency:
+            for group, fill in backgrounds:
+                group.insert(
+                    0, etree.Element("rect", width="100%", height="100%", fill=fill)
+                )
+        png = self._rasterize(root, self.filename, max_target_size, rasterizer)
+        sprite_png = png
+        if self.transparency and backgrounds:
+            sprite_png = self._composite(png, backgrounds[0][1])
+            if sprite_png is None:
+                # background is not a color Pillow knows, e.g. $AWS_FG_COLOR
+                return self._render_sprite_and_images(max_target_size, rasterizer)
+
+        images = {f"{self.target}.png": png}
         if self.filename_dark is not None:
-            self.generate_image(
-                path,
-                color,
+            images[f"{self.target}_Dark.png"] = self.generate_image(
+                True,
                 max_target_size,
-                transparency,
-                gradient,
-                self.filename_dark,
-                dark=True,
+                transparency=self.transparency,
+                gradient=False,
+                image_filename=self.filename_dark,
+                rasterizer=rasterizer,
             )
+        return sprite_png, images
+
+    def generate_mermaid(self):
+        """Returns the Mermaid icons for the icon and its dark variant as a list of
+        (name, body, width, height), from the same parse used for rendering"""
+        fragments = []
+        try:
+            for name, filename in (
+                (self.target2, self.filename),
+                (f"{self.target2}-dark", self.filename_dark),
+            ):
+                if filename is None:
+                    continue
+                svg_filename = re.sub(r"\.png$", ".svg", str(filename))
+                if svg_filename.endswith(".svg"):
+                    root = parse_svg(svg_filename, copy_tree=False).getroot()
+                    fragments.append((name, *mermaid_body(root)))
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"Error: {e} adding {self.target2} to aws-icons-mermaid.json")
+        return fragments
 
-    def generate_puml(self, path, sprite):
-        """Generate puml file for service"""
+    def generate_puml(self, sprite, images, split_img=False, lite=False):
+        """Generate puml file content for service from its sprite and PNG images
+
+        With split_img the PNG images are left to the <Target>IMG.puml file from
+        generate_puml_img, and $<Target>IMG() returns the sprite until it is included.
+        With lite there are no images or participant macros, $<Target>IMG() always
+        returns the sprite and images is not used.
+        """
         puml_content = PUML_LICENSE_HEADER
         target = self.target
         color = self.color
@@ -247,22 +308,22 @@ class Icon:
         group_label = self.group_label
 
         puml_content += sprite
-        if not self.skip_icon:
+        if not self.skip_icon and lite:
             puml_content += f"!function ${target}IMG($scale=1)\n"
-            if self.filename_dark is not None:
-                puml_content += (
-                    '!if %variable_exists("$AWS_DARK") && ($AWS_DARK == true)\n'
-                )
-                with open(f"{path}/{target}_Dark.png", "rb") as png_file:
-                    encoded_string = base64.b64encode(png_file.read())
-                    puml_content += f'!return "<img data:image/png;base64,{encoded_string.decode()}{{scale="+$scale+"}}>"\n'
-                puml_content += "!else\n"
-            with open(f"{path}/{target}.png", "rb") as png_file:
-                encoded_string = base64.b64encode(png_file.read())
-                puml_content += f'!return "<img data:image/png;base64,{encoded_string.decode()}{{scale="+$scale+"}}>"\n'
-            if self.filename_dark is not None:
-                puml_content += "!endif\n"
+            puml_content += f'!return "<${target}{{scale="+$scale+"}}>"\n'
             puml_content += "!endfunction\n\n"
+        elif not self.skip_icon and split_img:
+            # the image function is looked up when called, so <Target>IMG.puml can be
+            # included before or after this file
+            puml_content += f"!function ${target}IMG($scale=1)\n"
+            puml_content += f'!if %function_exists("${target}IMGData")\n'
+            puml_content += f'!return %call_user_func("${target}IMGData", $scale)\n'
+            puml_content += "!else\n"
+            puml_content += f'!return "<${target}{{scale="+$scale+"}}>"\n'
+            puml_content += "!endif\n"
+            puml_content += "!endfunction\n\n"
+        elif not self.skip_icon:
+            puml_content += self._puml_img_function(f"${target}IMG", images)
 
         if group:
             puml_content += f"$AWSGroupColoring({target}Group, {quoted_color}, {group_border_style}, {group_alignment})\n"
@@ -286,129 +347,228 @@ class Icon:
             puml_content += f"AWSEntityColoring({target})\n"
             puml_content += f"!define {target}(e_alias, e_label, e_techn) AWSEntity(e_alias, e_label, e_techn, {color}, {target}, {target})\n"
             puml_content += f"!define {target}(e_alias, e_label, e_techn, e_descr) AWSEntity(e_alias, e_label, e_techn, e_descr, {color}, {target}, {target})\n"
+            if lite:
+                return puml_content
             puml_content += f"!define {target}Participant(p_alias, p_label, p_techn) AWSParticipant(p_alias, p_label, p_techn, {color}, {target}, {target})\n"
             puml_content += f"!define {target}Participant(p_alias, p_label, p_techn, p_descr) AWSParticipant(p_alias, p_label, p_techn, p_descr, {color}, {target}, {target})\n"
 
-        with open(f"{path}/{target}.puml", "w", encoding="utf-8") as f:
-            f.write(puml_content)
+        return puml_content
+
+    def generate_puml_img(self, images):
+        """Generate the <Target>IMG.puml file content holding the PNG images of the service,
+        used by $<Target>IMG() of a .puml file generated with split_img"""
+        return PUML_LICENSE_HEADER + self._puml_img_function(
+            f"${self.target}IMGData", images
+        )
+
+    def _puml_img_function(self, name, images):
+        """Returns a PlantUML function returning the service's PNG image, dark when $AWS_DARK is set"""
+        target = self.target
+        puml_content = f"!function {name}($scale=1)\n"
+        if self.filename_dark is not None:
+            puml_content += '!if %variable_exists("$AWS_DARK") && ($AWS_DARK == true)\n'
+            encoded_string = base64.b64encode(images[f"{target}_Dark.png"])
+            puml_content += f'!return "<img data:image/png;base64,{encoded_string.decode()}{{scale="+$scale+"}}>"\n'
+            puml_content += "!else\n"
+        encoded_string = base64.b64encode(images[f"{target}.png"])
+        puml_content += f'!return "<img data:image/png;base64,{encoded_string.decode()}{{scale="+$scale+"}}>"\n'
+        if self.filename_dark is not None:
+            puml_content += "!endif\n"
+        puml_content += "!endfunction\n\n"
+        return puml_content
+
+    def generate_puml_sprite(self, png, plantuml=True, level="16z"):
+        """Generate puml sprite for service from PNG bytes, natively if plantuml is False
+
+        :param level: gray levels, 4z, 8z or 16z
+        :type level: str
+        """
+        target = self.target
+        if not plantuml:
+            return encode_sprite(png, target, level)
+
+        # Encode with this process's long-lived PlantUML JVM when possible
+        encoder = get_sprite_encoder()
+        if encoder.available:
+            try:
+                return encoder.encode(target, png, level)
+            except DaemonError as e:
+                print(
+                    f"Error encoding sprite for {target} with PlantUML daemon, {e}, falling back to -encodesprite"
+                )
+                encoder.available = False
 
-    def generate_puml_sprite(self, path):
-        """Generate puml sprite for service"""
-        # Start plantuml-mit-1.2026.2.jar and encode sprite from main PNG
+        # Start plantuml-mit-1.2026.2.jar and encode sprite from main PNG, the sprite
+        # is named after the file so it is written as <target>.png
         try:
-            target = self.target
-            result = subprocess.run(
-                [
-                    "java",
-                    "-jar",
-                    "-Djava.awt.headless=true",
-                    "./plantuml-mit-1.2026.2.jar",
-                    "-encodesprite",
-                    "16z",
-                    f"{path}/{target}.png",
-                ],
-                shell=False,
-                stdout=PIPE,
-                stderr=PIPE,
-            )
+            with tempfile.TemporaryDirectory() as temp_dir:
+                png_filename = f"{temp_dir}/{target}.png"
+                with open(png_filename, "wb") as png_file:
+                    png_file.write(png)
+                result = subprocess.run(
+                    [
+                        "java",
+                        "-jar",
+                        "-Djava.awt.headless=true",
+                        PLANTUML_JAR,
+                        "-encodesprite",
+                        level,
+                        png_filename,
+                    ],
+                    shell=False,
+                    stdout=PIPE,
+                    stderr=PIPE,
+                )
             puml_content = result.stdout.decode("UTF-8")
 
-            return puml_content
-
         except Exception as e:  # pylint: disable=broad-except
             print(f"Error executing plantuml jar file, {e}")
             sys.exit(1)
 
+        # raised rather than returned, so the worker never caches an empty sprite
+        if result.returncode != 0 or not puml_content.strip():
+            raise RuntimeError(
+                f"plantuml -encodesprite failed for {target} with exit code "
+                f"{result.returncode}: {result.stderr.decode('UTF-8', 'replace').strip()}"
+            )
+        return puml_content
+
     # Internal methods
-    def _set_values(self, source_name, source_category):
+    def _render_sprite_and_images(self, max_target_size, rasterizer):
+        """Render the sprite PNG and the images separately"""
+        sprite_png = self.generate_image(
+            True,
+            max_target_size,
+            transparency=False,
+            gradient=True,
+            rasterizer=rasterizer,
+        )
+        images = self.generate_images(
+            True,
+            max_target_size,
+            transparency=self.transparency,
+            gradient=False,
+            rasterizer=rasterizer,
+        )
+        return sprite_png, images
+
+    def _background_fills(self, root):
+        """Returns (group, fill) for each group that gets a background rect when not transparent"""
+        backgrounds = []
+        # For resource or category icons which are transparent, set fill to white
+        # TODO - can we query without namespaces?
+        elem = root.xpath('//s:g[starts-with(@id, "Icon-Resource")]', namespaces=SVG_NS)
+        if elem:
+            backgrounds.append((elem[0], "white"))
+        # For category icons, set fill to category color
+        elem = root.xpath(
+            '//s:g[starts-with(@id, "Icon-Architecture-Category")]', namespaces=SVG_NS
+        )
+        if elem:
+            backgrounds.append((elem[0], f"{self.color}"))
+        return backgrounds
+
+    @staticmethod
+    def _rasterize(root, image_filename, max_target_size, rasterizer):
+        # Generate PNG from the modified SVG
+        # The SVG files for services use a gradient fill that comes out as gray stepping otherwise
+        try:
+            return get_rasterizer(rasterizer).rasterize(
+                etree.tostring(root), max_target_size
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"Error executing {rasterizer} rasterizer on {image_filename}, {e}")
+            sys.exit(1)
+
+    @staticmethod
+    def _composite(png, fill):
+        """Returns PNG bytes of png over a solid fill, or None if fill is not a color"""
+        try:
+            background = ImageColor.getrgb(fill)
+        except ValueError:
+            return None
+        with Image.open(io.BytesIO(png)) as img:
+            rgba = img.convert("RGBA")
+        flattened = Image.alpha_composite(
+            Image.new("RGBA", rgba.size, background), rgba
+        )
+        buffer = io.BytesIO()
+        flattened.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def _set_values(self, source_name, source_category, config_index):
         """Set values if entry found in the config.yml file, otherwise set uncategorized and defaults"""
-        for i in self.config["Categories"]:
-            for j in self.config["Categories"][i]["Icons"]:
-                if j["Source"] == source_name and i == source_category:
-                    try:
-                        self.category = i
-                        self.target = j["Target"]
-                        self.target2 = j["Target2"]
-
-                        if "SourceDark" in j and "SourceDirDark" in j:
-                            self.filename_dark = (
-                                str(self.filename)
-                                .replace(j["SourceDir"], j["SourceDirDark"])
-                                .replace(j["Source"], j["SourceDark"])
-                            )
-
-                        if source_name.startswith("Res_"):
-                            self.target_size = 48
-                            self.transparency = True
-
-                        # Set color from icon, category, default then black
-                        if "Color" in j:
-                            if j["Color"].startswith("#") or j["Color"].startswith("$"):
-                                self.color = j["Color"]
-                            else:
-                                self.color = self._color_name(j["Color"])
-                        # check category
-                        elif "Color" in self.config["Categories"][i]:
-                            self.color = self._color_name(
-                                self.config["Categories"][i]["Color"]
-                            )
-                        elif "Color" in self.config["Defaults"]["Category"]:
-                            self.color = self._color_name(
-                                self.config["Defaults"]["Category"]["Color"]
-                            )
-                        else:
-                            print(
-                                f"No color definition found for {source_name}, using $AWS_FG_COLOR"
-                            )
-                            self.color = "$AWS_FG_COLOR"
-
-                        if source_category == "Groups":
-                            self.group = True
-
-                            group_border_style = self._group_value("BorderStyle", j)
-
-                            if group_border_style is not None:
-                                self.group_border_style = self._border_style(
-                                    group_border_style
-                                )
-                            else:
-                                print(
-                                    f"No border style definition found for {source_name}, using plain"
-                                )
-                                self.group_border_style = "plain"
-
-                            group_alignment = self._group_value("Alignment", j)
-                            if group_alignment is not None:
-                                self.group_alignment = self._alignment(group_alignment)
-                            else:
-                                print(
-                                    f"No alignment definition found for {source_name}, using left"
-                                )
-                                self.group_alignment = "left"
-
-                            group_label = j["Label"]
-
-                            if group_label is not None:
-                                self.group_label = group_label
-                            else:
-                                print(
-                                    f"No label definition found for {source_name}, using Generic group"
-                                )
-                                self.group_label = "Generic group"
-
-                        return
-                    except KeyError as e:
-                        print(f"Error: {e}")
+        j = config_index.lookup(source_category, source_name)
+        if j is not None:
+            try:
+                self.category = source_category
+                self.target = j["Target"]
+                self.target2 = j["Target2"]
+
+                if "SourceDark" in j and "SourceDirDark" in j:
+                    self.filename_dark = (
+                        str(self.filename)
+                        .replace(j["SourceDir"], j["SourceDirDark"])
+                        .replace(j["Source"], j["SourceDark"])
+                    )
+
+                if source_name.startswith("Res_"):
+                    self.target_size = 48
+                    self.transparency = True
+
+                # Set color from icon, category, default then black
+                self.color = config_index.color(source_category, j)
+                if self.color is None:
+                    print(
+                        f"No color definition found for {source_name}, using $AWS_FG_COLOR"
+                    )
+                    self.color = "$AWS_FG_COLOR"
+
+                if source_category == "Groups":
+                    self.group = True
+
+                    group_border_style = config_index.group_value("BorderStyle", j)
+
+                    if group_border_style is not None:
+                        self.group_border_style = self._border_style(group_border_style)
+                    else:
                         print(
-                            "config.yml requires minimal config section, please see documentation"
+                            f"No border style definition found for {source_name}, using plain"
                         )
-                        sys.exit(1)
-                    except TypeError as e:
-                        print(f"Error: {e}")
+                        self.group_border_style = "plain"
+
+                    group_alignment = config_index.group_value("Alignment", j)
+                    if group_alignment is not None:
+                        self.group_alignment = self._alignment(group_alignment)
+                    else:
+                        print(
+                            f"No alignment definition found for {source_name}, using left"
+                        )
+                        self.group_alignment = "left"
+
+                    group_label = j["Label"]
+
+                    if group_label is not None:
+                        self.group_label = group_label
+                    else:
                         print(
-                            "config.yml requires Defaults->Color definition, please see documentation"
+                            f"No label definition found for {source_name}, using Generic group"
                         )
-                        sys.exit(1)
+                        self.group_label = "Generic group"
+
+                return
+            except KeyError as e:
+                print(f"Error: {e}")
+                print(
+                    "config.yml requires minimal config section, please see documentation"
+                )
+                sys.exit(1)
+            except TypeError as e:
+                print(f"Error: {e}")
+                print(
+                    "config.yml requires Defaults->Color definition, please see documentation"
+                )
+                sys.exit(1)
 
         # Entry not found, place into uncategorized
         try:
@@ -494,23 +654,6 @@ class Icon:
                 pass
         return friendly_category
 
-    def _color_name(self, color_name):
-        """Returns hex color for provided name from config Defaults"""
-        try:
-            for color in self.config["Defaults"]["Colors"]:
-                if color == color_name:
-                    return self.config["Defaults"]["Colors"][color]
-            print(
-                f"ERROR: Color {color_name} not found in default color list, returning $AWS_FG_COLOR"
-            )
-            return "$AWS_FG_COLOR"
-        except KeyError as e:
-            print(f"Error: {e}")
-            print(
-                "config.yml requires minimal config section, please see documentation"
-            )
-            sys.exit(1)
-
     def _border_style(self, border_style):
         """Check and returns valid border style"""
 
@@ -526,12 +669,3 @@ class Icon:
             return alignment.lower()
         else:
             return "left"
-
-    def _group_value(self, key, icon):
-        if "Group" in icon and key in icon["Group"]:
-            return icon["Group"][key]
-        elif (
-            "Group" in self.config["Defaults"]
-            and key in self.config["Defaults"]["Group"]
-        ):
-            return self.config["Defaults"]["Group"][key]
@@ -0,0 +1,104 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Incremental JSON output for the large generated files in dist/
+"""
+
+import json
+import tempfile
+
+
+class JsonWriter:
+    """Writes a JSON document piece by piece with the same layout as ``json.dumps(obj, indent=indent)``,
+    or minified without any whitespace when indent is None
+
+    Containers are opened with ``begin_object``/``begin_array`` and closed with
+    ``end``. Members are written with ``value``, passing a key inside objects.
+
+    :param f: text file to write to
+    :type f: file
+    :param indent: spaces per level, None for minified output
+    :type indent: int
+    """
+
+    def __init__(self, f, indent=2):
+        self.f = f
+        self.indent = indent
+        # number of members written to each open container
+        self._counts = []
+        self._closing = []
+
+    def begin_object(self, key=None):
+        """Open an object, as a member named key of the enclosing object if given"""
+        self._member(key)
+        self.f.write("{")
+        self._counts.append(0)
+        self._closing.append("}")
+
+    def begin_array(self, key=None):
+        """Open an array, as a member named key of the enclosing object if given"""
+        self._member(key)
+        self.f.write("[")
+        self._counts.append(0)
+        self._closing.append("]")
+
+    def value(self, value, key=None):
+        """Write a complete value, as a member named key of the enclosing object if given"""
+        self._member(key)
+        if self.indent is None:
+            self.f.write(json.dumps(value, separators=(",", ":")))
+            return
+        text = json.dumps(value, indent=self.indent)
+        self.f.write(text.replace("\n", "\n" + " " * (self.indent * len(self._counts))))
+
+    def end(self):
+        """Close the innermost open object or array"""
+        count = self._counts.pop()
+        if count and self.indent is not None:
+            self.f.write("\n" + " " * (self.indent * len(self._counts)))
+        self.f.write(self._closing.pop())
+
+    def _member(self, key):
+        if not self._counts:
+            return
+        if self.indent is None:
+            self.f.write("," if self._counts[-1] else "")
+            self._counts[-1] += 1
+            if key is not None:
+                self.f.write(json.dumps(key) + ":")
+            return
+        self.f.write(",\n" if self._counts[-1] else "\n")
+        self._counts[-1] += 1
+        self.f.write(" " * (self.indent * len(self._counts)))
+        if key is not None:
+            self.f.write(json.dumps(key) + ": ")
+
+
+class Spool:
+    """Strings parked in a temporary file until written out, so they are not all held in memory"""
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()  # pylint: disable=consider-using-with
+
+    def add(self, text):
+        """Store text, returns a reference to read it back"""
+        data = text.encode("utf-8")
+        self._file.seek(0, 2)
+        offset = self._file.tell()
+        self._file.write(data)
+        return (offset, len(data))
+
+    def read(self, ref):
+        """Returns the text stored under ref"""
+        offset, length = ref
+        self._file.seek(offset)
+        return self._file.read(length).decode("utf-8")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,149 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Long-lived JVM helper process shared by the icon builder workers
+"""
+
+import os
+import struct
+import subprocess
+import threading
+import weakref
+from pathlib import Path
+from subprocess import PIPE
+
+BATIK_DIR = "batik-1.16"
+# Rhino ships with Batik and runs jvm_daemon.js without a compile step
+RHINO_JAR = f"{BATIK_DIR}/lib/rhino-1.7.7.jar"
+DAEMON_SCRIPT = Path(__file__).parent / "jvm_daemon.js"
+
+_INT = struct.Struct(">i")
+
+# daemons started by this process, for daemon_cpu_time()
+_DAEMONS = weakref.WeakSet()
+
+
+def daemon_cpu_time():
+    """Returns the CPU seconds used so far by this process's running JVM daemons
+
+    A running daemon is not a waited-for child, so its time is missing from
+    ``os.times()`` until it exits. Read from /proc, 0 where that is not available.
+    """
+    total = 0.0
+    for daemon in list(_DAEMONS):
+        total += daemon.cpu_time()
+    return total
+
+
+class DaemonError(Exception):
+    """Raised when the JVM helper fails to process a request"""
+
+
+class JvmDaemon:
+    """A JVM running jvm_daemon.js that processes requests sent over a pipe
+
+    Starting the JVM is the expensive part of running a jar, so each process
+    keeps one daemon around and sends it every request.
+
+    :param classpath: jars the daemon commands need, Rhino is added automatically
+    :type classpath: list
+    """
+
+    def __init__(self, classpath):
+        self.classpath = classpath
+        self.process = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the JVM if not already running"""
+        if self.process is not None and self.process.poll() is None:
+            return
+        self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+            [
+                "java",
+                "-Djava.awt.headless=true",
+                "-cp",
+                ":".join([RHINO_JAR] + self.classpath),
+                "org.mozilla.javascript.tools.shell.Main",
+                str(DAEMON_SCRIPT),
+            ],
+            shell=False,
+            stdin=PIPE,
+            stdout=PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        _DAEMONS.add(self)
+
+    def cpu_time(self):
+        """Returns the user and system CPU seconds used by the running JVM, 0 if unknown"""
+        if self.process is None:
+            return 0.0
+        try:
+            with open(f"/proc/{self.process.pid}/stat", encoding="ascii") as f:
+                # fields after the parenthesized command name, utime and stime are 14 and 15
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            return 0.0
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def close(self):
+        """Close stdin so the daemon exits, then wait for it"""
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+        self.process = None
+
+    def request(self, *fields):
+        """Send one command and its fields (str or bytes), returns the response bytes"""
+        return self.request_many([fields])[0]
+
+    def request_many(self, requests):
+        """Send a batch of requests, returns a list of response bytes in the same order
+
+        Requests are written from a separate thread while responses are read, so
+        a large batch cannot deadlock on full pipe buffers.
+        """
+        with self._lock:
+            self.start()
+            writer = threading.Thread(
+                target=self._write_requests,
+                args=(self.process.stdin, requests),
+                daemon=True,
+            )
+            writer.start()
+            try:
+                responses = [self._read_response() for _ in requests]
+            finally:
+                writer.join()
+        # read every response before raising so the pipe stays in sync
+        for ok, data in responses:
+            if not ok:
+                raise DaemonError(data.decode("utf-8", errors="replace"))
+        return [data for _, data in responses]
+
+    @staticmethod
+    def _write_requests(stdin, requests):
+        try:
+            for fields in requests:
+                stdin.write(_INT.pack(len(fields)))
+                for field in fields:
+                    if isinstance(field, str):
+                        field = field.encode("utf-8")
+                    stdin.write(_INT.pack(len(field)))
+                    stdin.write(field)
+            stdin.flush()
+        except (BrokenPipeError, ValueError):
+            # process died, reported by the reader
+            pass
+
+    def _read_response(self):
+        header = self.process.stdout.read(_INT.size)
+        if len(header) != _INT.size:
+            self.close()
+            raise DaemonError("JVM daemon exited unexpectedly")
+        (length,) = _INT.unpack(header)
+        return (length >= 0, self.process.stdout.read(abs(length)))
@@ -0,0 +1,121 @@
+// Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+//
+// Long-lived JVM helper used by awsicons/jvm.py
+//
+// Runs on the Rhino engine bundled with Batik so only a Java runtime is needed:
+//   java -Djava.awt.headless=true -cp "batik-1.16/lib/*" \
+//     org.mozilla.javascript.tools.shell.Main awsicons/jvm_daemon.js
+//
+// Protocol (all integers are 32-bit big-endian) on stdin/stdout:
+//   request:  <field count> then for each field <length> <length bytes>
+//             the first field is the command name
+//   response: <length> <length bytes>, or -<length> <UTF-8 error message>
+// The process exits when stdin is closed.
+//
+// Commands:
+//   rasterize <size> <svg>            -> PNG (requires Batik on the classpath)
+//   encodesprite <level> <name> <png> -> sprite text (requires PlantUML on the classpath)
+
+var io = java.io;
+
+// Keep stdout for the protocol only, any diagnostics go to stderr
+var out = new io.DataOutputStream(
+  new io.BufferedOutputStream(new io.FileOutputStream(io.FileDescriptor.out))
+);
+java.lang.System.setOut(java.lang.System.err);
+var input = new io.DataInputStream(
+  new io.BufferedInputStream(new io.FileInputStream(io.FileDescriptor["in"]))
+);
+
+function utf8(bytes) {
+  return String(new java.lang.String(bytes, "UTF-8"));
+}
+
+function rasterize(size, svg) {
+  var transcoder = Packages.org.apache.batik.transcoder;
+  var PNGTranscoder = transcoder.image.PNGTranscoder;
+  var png = new PNGTranscoder();
+  png.addTranscodingHint(PNGTranscoder.KEY_WIDTH, new java.lang.Float(size));
+  png.addTranscodingHint(PNGTranscoder.KEY_HEIGHT, new java.lang.Float(size));
+  var result = new io.ByteArrayOutputStream();
+  png.transcode(
+    new transcoder.TranscoderInput(new io.ByteArrayInputStream(svg)),
+    new transcoder.TranscoderOutput(result)
+  );
+  return result.toByteArray();
+}
+
+function plantumlClass(name) {
+  // The sprite classes moved package between PlantUML releases
+  var packages = [
+    "net.sourceforge.plantuml.klimt.sprite.",
+    "net.sourceforge.plantuml.sprite.",
+  ];
+  for (var i = 0; i < packages.length; i++) {
+    try {
+      java.lang.Class.forName(packages[i] + name);
+    } catch (e) {
+      continue;
+    }
+    return eval("Packages." + packages[i] + name);
+  }
+  throw new Error("PlantUML class " + name + " not found on classpath");
+}
+
+// Same as `java -jar plantuml.jar -encodesprite <level> <file.png>`
+function encodeSprite(level, name, png) {
+  var image = javax.imageio.ImageIO.read(new io.ByteArrayInputStream(png));
+  var grayLevel = plantumlClass("SpriteGrayLevel")["GRAY_" + parseInt(level, 10)];
+  var SpriteUtils = plantumlClass("SpriteUtils");
+  var text = /z$/i.test(level)
+    ? SpriteUtils.encodeCompressed(image, name, grayLevel)
+    : SpriteUtils.encode(image, name, grayLevel);
+  return new java.lang.String(text).getBytes("UTF-8");
+}
+
+function handle(fields) {
+  var command = utf8(fields[0]);
+  if (command === "rasterize") {
+    return rasterize(parseInt(utf8(fields[1]), 10), fields[2]);
+  }
+  if (command === "encodesprite") {
+    return encodeSprite(utf8(fields[1]), utf8(fields[2]), fields[3]);
+  }
+  throw new Error("unknown command " + command);
+}
+
+function main() {
+  for (;;) {
+    var count;
+    try {
+      count = input.readInt();
+    } catch (e) {
+      // EOFException, caller is done
+      return;
+    }
+    var fields = [];
+    for (var i = 0; i < count; i++) {
+      var field = java.lang.reflect.Array.newInstance(
+        java.lang.Byte.TYPE,
+        input.readInt()
+      );
+      input.readFully(field);
+      fields.push(field);
+    }
+    var data;
+    var length;
+    try {
+      data = handle(fields);
+      length = data.length;
+    } catch (e) {
+      data = new java.lang.String(String(e)).getBytes("UTF-8");
+      length = -data.length;
+    }
+    out.writeInt(length);
+    out.write(data, 0, data.length);
+    out.flush();
+  }
+}
+
+main();
@@ -0,0 +1,77 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Sprite-only dist-lite/ tree, cheaper for PlantUML to preprocess than dist/
+"""
+
+from pathlib import Path
+
+# Sprite gray levels of the lite .puml files
+LITE_LEVELS = ["4z", "8z", "16z"]
+# Suffix of an icon's lite .puml file in the worker output and the build cache
+LITE_SUFFIX = ".lite.puml"
+
+
+def split_lite(files):
+    """Split a dict of filename -> bytes into (dist files, lite files)
+
+    The lite files are renamed from <Target>.lite.puml to <Target>.puml.
+    """
+    dist, lite = {}, {}
+    for name, contents in files.items():
+        if name.endswith(LITE_SUFFIX):
+            lite[name[: -len(LITE_SUFFIX)] + ".puml"] = contents
+        else:
+            dist[name] = contents
+    return dist, lite
+
+
+class IncludeSizeReport:
+    """Bytes of each category's all.puml in dist/ and dist-lite/
+
+    :param dist_dir: dist/ tree
+    :type dist_dir: pathlib.Path
+    :param lite_dir: dist-lite/ tree
+    :type lite_dir: pathlib.Path
+    """
+
+    def __init__(self, dist_dir, lite_dir):
+        self.dist_dir = Path(dist_dir)
+        self.lite_dir = Path(lite_dir)
+
+    def sizes(self):
+        """Returns {category: (dist bytes, lite bytes)}, 0 for a missing all.puml"""
+        categories = sorted(
+            {p.parent.name for p in self.dist_dir.glob("*/all.puml")}
+            | {p.parent.name for p in self.lite_dir.glob("*/all.puml")}
+        )
+        return {
+            category: (
+                _size(self.dist_dir / category / "all.puml"),
+                _size(self.lite_dir / category / "all.puml"),
+            )
+            for category in categories
+        }
+
+    def lines(self):
+        """Returns the report as printable lines, sorted by category"""
+        lines = [f"{'all.puml':<28} {'dist':>10} {'dist-lite':>10} {'Saved':>7}"]
+        totals = [0, 0]
+        for category, (full, lite) in self.sizes().items():
+            totals[0] += full
+            totals[1] += lite
+            lines.append(_line(category, full, lite))
+        lines.append(_line("Total", *totals))
+        return lines
+
+
+def _size(path):
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _line(name, full, lite):
+    saved = f"{(full - lite) / full:.1%}" if full else "-"
+    return f"{name:<28} {full:>10} {lite:>10} {saved:>7}"
@@ -0,0 +1,193 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Size reduction, reporting and per-category shards for the Mermaid icon pack (aws-icons-mermaid.json)
+"""
+
+import json
+import re
+import zlib
+
+from awsicons.jsonstream import JsonWriter
+
+# Attributes holding coordinates or lengths in the SVG bodies
+GEOMETRY_ATTRIBUTE = re.compile(
+    r'(\s(?:d|points|transform|x|y|x1|y1|x2|y2|cx|cy|r|rx|ry|width|height)=")([^"]*)"'
+)
+DECIMAL_NUMBER = re.compile(r"-?\d*\.\d+(?:[eE][-+]?\d+)?")
+
+
+def round_coordinates(body, precision=2):
+    """Round the decimal numbers in geometry attributes of an SVG body to precision places
+
+    Trailing zeros are dropped. Path data can run numbers together (``1.5.5``
+    is 1.5 then 0.5), so a space is added where a rounded number would
+    otherwise merge with the one before it.
+
+    :param precision: decimal places, 0 or more
+    :type precision: int
+    """
+    if precision < 0:
+        raise ValueError(f"Precision must be 0 or more, not {precision}")
+
+    def round_number(match):
+        value = round(float(match.group(0)), precision)
+        text = f"{value:.{precision}f}"
+        if precision > 0:
+            # without a decimal point the zeros are part of the integer
+            text = text.rstrip("0").rstrip(".")
+        if text in ("-0", ""):
+            text = "0"
+        start = match.start()
+        previous = match.string[start - 1] if start else ""
+        if not text.startswith("-") and (previous.isdigit() or previous == "."):
+            text = " " + text
+        return text
+
+    def round_attribute(match):
+        return match.group(1) + DECIMAL_NUMBER.sub(round_number, match.group(2)) + '"'
+
+    return GEOMETRY_ATTRIBUTE.sub(round_attribute, body)
+
+
+class SizeReport:
+    """Compressed sizes of the icon pack per category, fed as the JSON is written
+
+    Brotli sizes are reported when the optional ``brotli`` package is installed.
+    """
+
+    def __init__(self):
+        try:
+            import brotli  # pylint: disable=import-outside-toplevel
+
+            self._brotli = brotli
+        except ImportError:
+            self._brotli = None
+        self._categories = {}
+
+    def add(self, category, text):
+        """Count the JSON text written for an icon of category"""
+        if category not in self._categories:
+            self._categories[category] = {
+                "icons": 0,
+                "raw": 0,
+                "gzip": zlib.compressobj(9, zlib.DEFLATED, 31),
+                "brotli": self._brotli.Compressor() if self._brotli else None,
+                "compressed": [0, 0],
+            }
+        entry = self._categories[category]
+        data = text.encode("utf-8")
+        entry["icons"] += 1
+        entry["raw"] += len(data)
+        entry["compressed"][0] += len(entry["gzip"].compress(data))
+        if entry["brotli"] is not None:
+            entry["compressed"][1] += len(entry["brotli"].process(data))
+
+    def lines(self, total_size=None):
+        """Returns the report as printable lines, sorted by category"""
+        lines = [
+            f"{'Category':<28} {'Icons':>6} {'Raw':>10} {'Gzip':>10} {'Brotli':>10}"
+        ]
+        totals = [0, 0, 0, 0]
+        for category in sorted(self._categories):
+            entry = self._categories[category]
+            gzip_size = entry["compressed"][0] + len(entry["gzip"].flush())
+            brotli_size = None
+            if entry["brotli"] is not None:
+                brotli_size = entry["compressed"][1] + len(entry["brotli"].finish())
+            for i, value in enumerate(
+                (entry["icons"], entry["raw"], gzip_size, brotli_size or 0)
+            ):
+                totals[i] += value
+            lines.append(
+                f"{category:<28} {entry['icons']:>6} {entry['raw']:>10} {gzip_size:>10} "
+                f"{brotli_size if brotli_size is not None else '-':>10}"
+            )
+        brotli_total = totals[3] if self._brotli else "-"
+        lines.append(
+            f"{'Total':<28} {totals[0]:>6} {totals[1]:>10} {totals[2]:>10} {brotli_total:>10}"
+        )
+        if total_size is not None:
+            lines.append(f"aws-icons-mermaid.json: {total_size} bytes")
+        return lines
+
+
+class MermaidShards:
+    """One iconify JSON file per category, plus a manifest mapping each icon name to its file
+
+    Shards are written as icons are added and closed together, so a client can
+    load only the categories a diagram uses. An alias is kept only when its
+    parent is in the same shard, otherwise the full icon is written.
+
+    :param path: directory for the shards and manifest.json
+    :type path: pathlib.Path
+    :param header: iconify members written at the start of every shard (prefix, width, ...)
+    :type header: dict
+    :param indent: JSON indent, None for minified output
+    :type indent: int
+    """
+
+    def __init__(self, path, header, indent=2):
+        self.path = path
+        self.header = header
+        self.indent = indent
+        self._shards = {}
+        # icon name -> shard filename
+        self.manifest = {}
+
+    def add(self, category, name, icon, parent=None):
+        """Add an icon to its category shard, as an alias of parent when in the same shard"""
+        shard = self._shard(category)
+        self.manifest[name] = shard["filename"]
+        if parent is not None and parent in shard["names"]:
+            shard["aliases"][name] = {"parent": parent}
+            return
+        shard["names"].add(name)
+        shard["writer"].value(icon, name)
+
+    def close(self):
+        """Finish every shard and write manifest.json"""
+        for category, shard in self._shards.items():
+            writer = shard["writer"]
+            writer.end()
+            if shard["aliases"]:
+                writer.value(shard["aliases"], "aliases")
+            info = dict(self.header.get("info", {}))
+            info["name"] = f"{info.get('name', 'Icons')} - {category}"
+            info["total"] = len(shard["names"]) + len(shard["aliases"])
+            writer.value(info, "info")
+            writer.end()
+            shard["file"].close()
+        manifest = {
+            "prefix": self.header.get("prefix"),
+            "shards": {
+                category: shard["filename"] for category, shard in self._shards.items()
+            },
+            "icons": self.manifest,
+        }
+        with open(self.path / "manifest.json", "w", encoding="utf-8") as f:
+            if self.indent is None:
+                json.dump(manifest, f, separators=(",", ":"))
+            else:
+                json.dump(manifest, f, indent=self.indent)
+
+    def _shard(self, category):
+        if category not in self._shards:
+            filename = f"{category}.json"
+            f = open(  # pylint: disable=consider-using-with
+                self.path / filename, "w", encoding="utf-8"
+            )
+            writer = JsonWriter(f, indent=self.indent)
+            writer.begin_object()
+            for key, value in self.header.items():
+                if key != "info":
+                    writer.value(value, key)
+            writer.begin_object("icons")
+            self._shards[category] = {
+                "filename": filename,
+                "file": f,
+                "writer": writer,
+                "names": set(),
+                "aliases": {},
+            }
+        return self._shards[category]
@@ -0,0 +1,165 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Lossless size optimization of the generated PNG files
+"""
+
+import io
+import zlib
+
+import numpy as np
+from PIL import Image
+
+# zlib strategies tried for every candidate encoding
+ZLIB_STRATEGIES = [
+    zlib.Z_DEFAULT_STRATEGY,
+    zlib.Z_FILTERED,
+    zlib.Z_HUFFMAN_ONLY,
+    zlib.Z_RLE,
+    zlib.Z_FIXED,
+]
+
+
+# gAMA and cHRM values of sRGB, as written by Batik next to the sRGB chunk
+SRGB_GAMMA = 0.45455
+SRGB_CHROMATICITY = (0.3127, 0.329, 0.64, 0.33, 0.3, 0.6, 0.15, 0.06)
+# PNG stores these as integers in units of 1/100000
+SRGB_TOLERANCE = 2e-5
+
+
+def _is_srgb(info):
+    """Returns True if the color chunks of a PNG describe plain sRGB, or there are none"""
+    if "icc_profile" in info:
+        return False
+    if "srgb" in info:
+        # the sRGB chunk overrides gAMA and cHRM, which are only fallbacks for it
+        return True
+    if "gamma" in info and abs(info["gamma"] - SRGB_GAMMA) > SRGB_TOLERANCE:
+        return False
+    if "chromaticity" in info and any(
+        abs(value - expected) > SRGB_TOLERANCE
+        for value, expected in zip(info["chromaticity"], SRGB_CHROMATICITY)
+    ):
+        return False
+    return True
+
+
+def _candidates(rgba):
+    """Returns (image, save options) for each lossless encoding of an RGBA image"""
+    pixels = np.asarray(rgba)
+    opaque = bool((pixels[:, :, 3] == 255).all())
+    gray = bool(
+        (pixels[:, :, 0] == pixels[:, :, 1]).all()
+        and (pixels[:, :, 1] == pixels[:, :, 2]).all()
+    )
+    candidates = [(rgba, {})]
+    if opaque:
+        candidates.append((rgba.convert("RGB"), {}))
+    if gray:
+        candidates.append((rgba.convert("L" if opaque else "LA"), {}))
+
+    packed = pixels.reshape(-1, 4).copy().view(np.uint32).ravel()
+    colors, indices = np.unique(packed, return_inverse=True)
+    if len(colors) <= 256:
+        palette = colors.view(np.uint8).reshape(-1, 4)
+        # translucent entries first, so the tRNS chunk stops at the last of them
+        order = np.argsort(palette[:, 3] == 255, kind="stable")
+        position = np.empty_like(order)
+        position[order] = np.arange(len(order))
+        image = Image.fromarray(
+            position[indices].reshape(pixels.shape[:2]).astype(np.uint8), "P"
+        )
+        if opaque:
+            image.putpalette(palette[order][:, :3].tobytes(), rawmode="RGB")
+        else:
+            image.putpalette(palette[order].tobytes(), rawmode="RGBA")
+        bits = next(b for b in (1, 2, 4, 8) if len(colors) <= 1 << b)
+        candidates.append((image, {"bits": bits}))
+    return candidates
+
+
+def optimize_png(data):
+    """Returns the smallest lossless PNG encoding of data, or data if nothing is smaller
+
+    Tries RGB, grayscale and palette images where they hold the same pixels,
+    with every zlib strategy at level 9, and drops metadata (EXIF, text and
+    the sRGB, gAMA and cHRM chunks when they describe sRGB, which is the
+    assumed color space anyway). PNGs with another gamma, other primaries or
+    an ICC profile are returned unchanged. The decoded pixels of the result are
+    checked against the input.
+
+    :param data: PNG file
+    :type data: bytes
+    :return: PNG file
+    :rtype: bytes
+    """
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    if not _is_srgb(image.info):
+        return data
+    rgba = image.convert("RGBA")
+    best = data
+    for candidate, options in _candidates(rgba):
+        for strategy in ZLIB_STRATEGIES:
+            out = io.BytesIO()
+            candidate.save(
+                out, "PNG", compress_level=9, compress_type=strategy, **options
+            )
+            if out.tell() < len(best):
+                best = out.getvalue()
+    if best is not data:
+        result = Image.open(io.BytesIO(best)).convert("RGBA")
+        if result.tobytes() != rgba.tobytes():
+            return data
+    return best
+
+
+def optimize_files(files):
+    """Optimize the PNGs in a dict of filename -> bytes in place
+
+    :return: (number of PNGs, bytes before, bytes after)
+    :rtype: tuple
+    """
+    count = before = after = 0
+    for name, data in files.items():
+        if not name.endswith(".png"):
+            continue
+        files[name] = optimize_png(data)
+        count += 1
+        before += len(data)
+        after += len(files[name])
+    return (count, before, after)
+
+
+class PngSizeReport:
+    """Bytes of the generated PNGs before and after optimization, per category"""
+
+    def __init__(self):
+        # category -> [files, bytes before, bytes after]
+        self._categories = {}
+
+    def add(self, category, files, before, after):
+        """Count the PNG files of an icon of category"""
+        entry = self._categories.setdefault(category, [0, 0, 0])
+        entry[0] += files
+        entry[1] += before
+        entry[2] += after
+
+    def lines(self):
+        """Returns the report as printable lines, sorted by category"""
+        lines = [
+            f"{'Category':<28} {'PNGs':>6} {'Before':>10} {'After':>10} {'Saved':>7}"
+        ]
+        totals = [0, 0, 0]
+        for category in sorted(self._categories):
+            entry = self._categories[category]
+            for i, value in enumerate(entry):
+                totals[i] += value
+            lines.append(_line(category, *entry))
+        lines.append(_line("Total", *totals))
+        return lines
+
+
+def _line(name, files, before, after):
+    saved = f"{(before - after) / before:.1%}" if before else "-"
+    return f"{name:<28} {files:>6} {before:>10} {after:>10} {saved:>7}"
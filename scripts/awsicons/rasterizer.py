@@ -0,0 +1,129 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+SVG rasterizer backends shared by the icon builder workers
+"""
+
+import io
+import subprocess
+from subprocess import PIPE
+
+import numpy as np
+from awsicons.jvm import BATIK_DIR, JvmDaemon
+from PIL import Image
+
+
+class RasterizerError(Exception):
+    """Raised when a backend cannot render an SVG or is not installed"""
+
+
+class Rasterizer:
+    """Converts SVG bytes to PNG bytes
+
+    Backends implement ``rasterize``, ``rasterize_many`` sends a batch through it
+    unless the backend has a faster way.
+    """
+
+    def rasterize(self, svg, size):
+        """Convert SVG bytes to a square PNG of size pixels and return the PNG bytes"""
+        raise NotImplementedError
+
+    def rasterize_many(self, requests):
+        """Convert a batch of (svg_bytes, size) requests, returns list of PNG bytes"""
+        return [self.rasterize(svg, size) for svg, size in requests]
+
+
+class BatikDaemon(JvmDaemon, Rasterizer):
+    """Batik running in a single JVM that converts SVG bytes to PNG bytes"""
+
+    def __init__(self, batik_dir=BATIK_DIR):
+        super().__init__([f"{batik_dir}/lib/*"])
+
+    def rasterize(self, svg, size):
+        return self.rasterize_many([(svg, size)])[0]
+
+    def rasterize_many(self, requests):
+        return self.request_many(
+            [("rasterize", str(int(size)), svg) for svg, size in requests]
+        )
+
+
+class ResvgRasterizer(Rasterizer):
+    """resvg called in-process through the resvg-py bindings, no temp files or forks"""
+
+    def __init__(self):
+        try:
+            import resvg_py  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise RasterizerError(
+                "resvg-py is not installed, run with: uv run --with resvg-py icon-builder.py"
+            ) from e
+        self._resvg = resvg_py
+
+    def rasterize(self, svg, size):
+        try:
+            return bytes(
+                self._resvg.svg_to_bytes(
+                    svg_string=svg.decode("utf-8"),
+                    width=int(size),
+                    height=int(size),
+                    skip_system_fonts=True,
+                )
+            )
+        except ValueError as e:
+            raise RasterizerError(str(e)) from e
+
+
+class RsvgConvertRasterizer(Rasterizer):
+    """rsvg-convert (librsvg) command line reading SVG from stdin, one process per image (experimental)"""
+
+    def rasterize(self, svg, size):
+        try:
+            result = subprocess.run(
+                ["rsvg-convert", "-w", str(size), "-h", str(size)],
+                input=svg,
+                shell=False,
+                stdout=PIPE,
+                stderr=PIPE,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise RasterizerError(f"rsvg-convert failed, {e}") from e
+        return result.stdout
+
+
+RASTERIZERS = {
+    "batik": BatikDaemon,
+    "resvg": ResvgRasterizer,
+    "rsvg": RsvgConvertRasterizer,
+}
+
+_rasterizers = {}
+
+
+def get_rasterizer(name="batik"):
+    """Returns the named rasterizer for this process, e.g. one Batik JVM per Pool worker"""
+    if name not in _rasterizers:
+        _rasterizers[name] = RASTERIZERS[name]()
+    return _rasterizers[name]
+
+
+def pixel_diff(png_a, png_b):
+    """Compare two PNGs pixel by pixel
+
+    Colors are premultiplied by alpha so fully transparent pixels compare equal
+    whatever color value each renderer left in them.
+
+    :return: (largest channel difference, mean channel difference), both 0-255
+    :rtype: tuple
+    """
+    with Image.open(io.BytesIO(png_a)) as a, Image.open(io.BytesIO(png_b)) as b:
+        if a.size != b.size:
+            return (255, 255.0)
+        pixels = [np.asarray(img.convert("RGBA"), dtype=np.int32) for img in (a, b)]
+    premultiplied = [
+        np.concatenate([p[..., :3] * p[..., 3:] // 255, p[..., 3:]], axis=2)
+        for p in pixels
+    ]
+    delta = np.abs(premultiplied[0] - premultiplied[1])
+    return (int(delta.max()), float(delta.mean()))
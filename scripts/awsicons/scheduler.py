@@ -0,0 +1,102 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Ordering of icon tasks by estimated cost, so the Pool finishes together
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+# Estimated seconds per task when there is no history
+TOUCH_COST = 0.001
+CACHED_COST = 0.005
+PNG_COST = 0.02
+SVG_COST = 0.05
+# additional seconds per byte of SVG source
+SVG_BYTE_COST = 1e-6
+
+# Tasks estimated at or below this are sent to the workers in chunks, PNG copies included
+CHEAP_COST = PNG_COST
+CHUNK_SIZE = 16
+
+
+def estimate_cost(task, history=None, cached=False):
+    """Returns the estimated seconds a worker needs for an icon task
+
+    A cached icon is only copied. Otherwise the time taken the last time the
+    icon was built is used, or an estimate from the source type and SVG size,
+    doubled for a dark variant.
+
+    :param task: icon to estimate
+    :type task: awsicons.icon.IconTask
+    :param history: seconds per source filename from previous builds
+    :type history: dict
+    :param cached: the build cache holds the icon's files
+    :type cached: bool
+    """
+    filename = str(task.filename)
+    if task.skip_icon:
+        return TOUCH_COST
+    if cached:
+        return CACHED_COST
+    if history and filename in history:
+        return history[filename]
+    cost = 0.0
+    for source in (task.filename, task.filename_dark):
+        if source is None:
+            continue
+        if str(source).endswith(".svg"):
+            try:
+                size = os.path.getsize(source)
+            except OSError:
+                size = 0
+            cost += SVG_COST + size * SVG_BYTE_COST
+        else:
+            cost += PNG_COST
+    return cost
+
+
+def schedule(costs, cheap_cost=CHEAP_COST, chunk_size=CHUNK_SIZE):
+    """Returns the task names as a list of chunks, most expensive first
+
+    Expensive tasks are in chunks of their own, so the longest jobs start
+    first and the Pool's shared queue lets idle workers pick up the rest.
+    Tasks costing cheap_cost or less are grouped into chunks of chunk_size to
+    save round trips.
+
+    :param costs: estimated cost per task name
+    :type costs: dict
+    """
+    ordered = sorted(costs, key=lambda name: -costs[name])
+    chunks = [[name] for name in ordered if costs[name] > cheap_cost]
+    cheap = [name for name in ordered if costs[name] <= cheap_cost]
+    chunks.extend(cheap[i : i + chunk_size] for i in range(0, len(cheap), chunk_size))
+    return chunks
+
+
+class TimingHistory:
+    """Seconds taken to build each icon, kept between builds to estimate costs
+
+    :param path: JSON file of source filename -> seconds
+    :type path: pathlib.Path
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.seconds = json.load(f)
+        except (OSError, ValueError):
+            self.seconds = {}
+
+    def update(self, seconds):
+        """Record new timings and save the history"""
+        self.seconds.update(seconds)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # written to a temporary file and renamed, so an interrupted build leaves the old history
+        fd, temp = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.seconds, f, indent=0, sort_keys=True)
+        os.replace(temp, self.path)
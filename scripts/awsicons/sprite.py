@@ -0,0 +1,123 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+PlantUML sprite encoding, natively or through a long-lived PlantUML process
+"""
+
+import io
+import zlib
+
+import numpy as np
+from awsicons.jvm import JvmDaemon
+from PIL import Image
+
+PLANTUML_JAR = "./plantuml-mit-1.2026.2.jar"
+
+# PlantUML's URL-safe base64 alphabet (net.sourceforge.plantuml.code.AsciiEncoder)
+SPRITE_ALPHABET = np.frombuffer(
+    b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_", dtype=np.uint8
+)
+SPRITE_LINE_LENGTH = 120
+
+
+def encode_sprite(png, target, level="16z"):
+    """Encode PNG bytes as a PlantUML sprite without starting Java
+
+    Pixels are reduced to gray with PlantUML's (299, 587, 114) weights, ignoring
+    alpha as PlantUML does, then quantized and inverted to the requested number
+    of levels. Compressed levels are raw deflate streams in PlantUML's base64
+    variant, split into 120 character lines.
+
+    The decoded pixels and the text layout match ``-encodesprite``. PlantUML
+    compresses with its own Zopfli port, so the encoded characters differ from
+    the jar (and are slightly longer) while rendering identically.
+
+    :param png: PNG image bytes
+    :type png: bytes
+    :param target: sprite name
+    :type target: str
+    :param level: gray levels, 4z, 8z or 16z
+    :type level: str
+    :return: sprite text, same as the ``-encodesprite`` command line output
+    :rtype: str
+    """
+    colors = int(level.rstrip("zZ"))
+    if colors not in (4, 8, 16) or not level.lower().endswith("z"):
+        raise ValueError(f"Unsupported sprite level {level}, use 4z, 8z or 16z")
+    with Image.open(io.BytesIO(png)) as img:
+        rgb = np.asarray(img.convert("RGB"), dtype=np.uint32)
+    height, width = rgb.shape[:2]
+    gray = (rgb[..., 0] * 299 + rgb[..., 1] * 587 + rgb[..., 2] * 114) // 1000
+    raw = (colors - 1 - gray * colors // 256).astype(np.uint8)
+
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    data = compressor.compress(raw.tobytes()) + compressor.flush()
+    encoded = _ascii_encode(data)
+
+    header = f"sprite ${target} [{width}x{height}/{colors}z] "
+    if len(encoded) <= SPRITE_LINE_LENGTH:
+        return header + encoded + "\n\n"
+    lines = [
+        encoded[i : i + SPRITE_LINE_LENGTH]
+        for i in range(0, len(encoded), SPRITE_LINE_LENGTH)
+    ]
+    return header + "{\n" + "\n".join(lines) + "\n}\n\n"
+
+
+def _ascii_encode(data):
+    """PlantUML base64 variant, 3 bytes to 4 characters, trailing zeros ("0") dropped"""
+    padded = np.frombuffer(data + b"\0" * (-len(data) % 3), dtype=np.uint8)
+    triples = padded.reshape(-1, 3).astype(np.uint32)
+    value = (triples[:, 0] << 16) | (triples[:, 1] << 8) | triples[:, 2]
+    sextets = np.stack(
+        [(value >> 18) & 63, (value >> 12) & 63, (value >> 6) & 63, value & 63],
+        axis=1,
+    )
+    return SPRITE_ALPHABET[sextets.ravel()].tobytes().decode("ascii").rstrip("0")
+
+
+class SpriteEncoder(JvmDaemon):
+    """PlantUML running in a single JVM that encodes PNG bytes as sprites
+
+    Output matches ``java -jar plantuml.jar -encodesprite <level> <target>.png``,
+    including the trailing blank line printed by the command line.
+    """
+
+    def __init__(self, plantuml_jar=PLANTUML_JAR):
+        super().__init__([plantuml_jar])
+        # Cleared after a failure so callers fall back to the command line
+        self.available = True
+
+    def encode(self, target, png, level="16z"):
+        """Returns the sprite text for PNG bytes, named after target"""
+        return self.encode_many({target: png}, level)[target]
+
+    def encode_many(self, pngs, level="16z"):
+        """Encode a batch of PNGs with one PlantUML process
+
+        :param pngs: PNG bytes keyed by target name
+        :type pngs: dict
+        :param level: sprite gray level and compression (4, 8, 16, 4z, 8z or 16z)
+        :type level: str
+        :return: sprite text keyed by target name
+        :rtype: dict
+        """
+        targets = list(pngs)
+        responses = self.request_many(
+            [("encodesprite", level, target, pngs[target]) for target in targets]
+        )
+        return {
+            target: response.decode("utf-8") + "\n"
+            for target, response in zip(targets, responses)
+        }
+
+
+_encoder = None
+
+
+def get_sprite_encoder():
+    """Returns the sprite encoder for this process, one JVM per Pool worker"""
+    global _encoder  # pylint: disable=global-statement
+    if _encoder is None:
+        _encoder = SpriteEncoder()
+    return _encoder
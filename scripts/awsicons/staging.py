@@ -0,0 +1,183 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Staged build of an output directory, published by rename when complete
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# renameat2() flag to swap two paths atomically (Linux)
+RENAME_EXCHANGE = 2
+AT_FDCWD = -100
+
+
+def exchange(a, b):
+    """Atomically swap two paths with renameat2(), returns False where not supported"""
+    if not sys.platform.startswith("linux"):
+        return False
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    if not hasattr(libc, "renameat2"):
+        return False
+    result = libc.renameat2(
+        AT_FDCWD, os.fsencode(a), AT_FDCWD, os.fsencode(b), RENAME_EXCHANGE
+    )
+    if result != 0:
+        error = ctypes.get_errno()
+        # not supported by the kernel or file system
+        if error in (errno.EINVAL, errno.ENOSYS):
+            return False
+        raise OSError(error, os.strerror(error), str(a), None, str(b))
+    return True
+
+
+class StagedDir:
+    """Build into a sibling staging directory and swap it in for path when done
+
+    The published directory stays complete for the whole build. Staged files
+    that are unchanged from the previous build are replaced with hardlinks to
+    the previous files before the swap, so they keep their inode and mtime,
+    and the staged copy is freed when the previous directory is removed.
+
+    With a manifest, the size, mtime and SHA-256 of every published file are
+    saved at publish, so the next build compares digests and only reads the
+    published files the manifest does not match.
+
+    :param path: directory to publish, e.g. ``../dist``
+    :type path: pathlib.Path
+    :param manifest: JSON file of relative path -> [size, mtime_ns, sha256]
+    :type manifest: pathlib.Path
+    """
+
+    def __init__(self, path, manifest=None):
+        self.path = Path(path)
+        self.staging = self.path.parent / f".{self.path.name}-staging"
+        self.previous = self.path.parent / f".{self.path.name}-previous"
+        self.manifest = Path(manifest) if manifest is not None else None
+
+    def prepare(self):
+        """Create an empty staging directory, removing any left by a failed build"""
+        for path in (self.staging, self.previous):
+            if path.exists():
+                shutil.rmtree(path)
+        self.staging.mkdir()
+        return self.staging
+
+    def link_unchanged(self, digests=None):
+        """Hardlink staged files identical to the published ones, returns the number linked
+
+        Files of a different size are skipped without reading them. Otherwise
+        the staged file's SHA-256, from digests or read from the file, is
+        compared with the manifest's digest for the published file, when its
+        size and mtime still match the manifest, and byte by byte when not.
+
+        :param digests: SHA-256 hex digest per staged path relative to the
+            staging directory, e.g. ``WriteBehind.digests``, filled in for the
+            other staged files
+        :type digests: dict
+        """
+        digests = {} if digests is None else digests
+        manifest = self._read_manifest()
+        can_link = self.path.is_dir()
+        linked = 0
+        # plain os.path strings, pathlib dominates the time of a loop over every file
+        staging, path = str(self.staging), str(self.path)
+        for root, _, files in os.walk(staging):
+            directory = os.path.relpath(root, staging)
+            for name in files:
+                staged = os.path.join(root, name)
+                relative = name if directory == "." else f"{directory}/{name}"
+                if relative not in digests:
+                    digests[relative] = file_digest(staged)
+                if not can_link:
+                    continue
+                published = os.path.join(path, relative)
+                try:
+                    stat = os.stat(published)
+                except FileNotFoundError:
+                    continue
+                if stat.st_size != os.stat(staged).st_size:
+                    continue
+                entry = manifest.get(relative)
+                if entry is not None and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+                    unchanged = entry[2] == digests[relative]
+                else:
+                    unchanged = filecmp.cmp(staged, published, shallow=False)
+                if not unchanged:
+                    continue
+                temp = os.path.join(root, f".{name}.link")
+                try:
+                    os.link(published, temp)
+                except OSError:
+                    # no hardlinks on this file system, keep the staged copies
+                    can_link = False
+                    continue
+                os.replace(temp, staged)
+                linked += 1
+        return linked
+
+    def publish(self, digests=None):
+        """Link unchanged files and swap the staging directory in for path
+
+        Where renameat2() is available the two directories are exchanged
+        atomically, otherwise the previous directory is renamed aside and the
+        staging directory renamed into place, leaving path missing only
+        between the two renames. Returns the number of files linked.
+
+        :param digests: SHA-256 hex digest per staged path, see link_unchanged
+        :type digests: dict
+        """
+        digests = dict(digests or {})
+        linked = self.link_unchanged(digests)
+        if self.path.exists():
+            if exchange(self.staging, self.path):
+                os.rename(self.staging, self.previous)
+            else:
+                os.rename(self.path, self.previous)
+                os.rename(self.staging, self.path)
+        else:
+            os.rename(self.staging, self.path)
+        if self.previous.exists():
+            shutil.rmtree(self.previous)
+        if self.manifest is not None:
+            self._write_manifest(digests)
+        return linked
+
+    def _read_manifest(self):
+        if self.manifest is None:
+            return {}
+        try:
+            with open(self.manifest, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, digests):
+        manifest = {}
+        for relative, digest in digests.items():
+            try:
+                stat = os.stat(os.path.join(self.path, relative))
+            except FileNotFoundError:
+                continue
+            manifest[relative] = [stat.st_size, stat.st_mtime_ns, digest]
+        self.manifest.parent.mkdir(parents=True, exist_ok=True)
+        # written to a temporary file and renamed, so an interrupted build leaves the old manifest
+        fd, temp = tempfile.mkstemp(dir=self.manifest.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"), sort_keys=True)
+        os.replace(temp, self.manifest)
+
+
+def file_digest(path):
+    """Returns the SHA-256 hex digest of a file"""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
@@ -0,0 +1,62 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Source SVG parsing shared by the PNG, sprite and Mermaid outputs
+"""
+
+import copy
+import os
+import re
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+
+from lxml import etree
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+
+# Register the SVG namespace to avoid automatic namespace additions
+ET.register_namespace("", SVG_NAMESPACE)
+ET.register_namespace("xlink", "http://www.w3.org/1999/xlink")
+
+
+@lru_cache(maxsize=32)
+def _parse(filename, mtime_ns):  # pylint: disable=unused-argument
+    parser = etree.XMLParser(remove_blank_text=True)
+    return etree.parse(filename, parser)
+
+
+def parse_svg(filename, copy_tree=True):
+    """Returns the parsed tree of an SVG file, parsed once per process while unchanged
+
+    Trees are cached by path and modification time, so the light and dark
+    renders and the Mermaid body of an icon share one parse.
+
+    :param filename: SVG file
+    :type filename: str
+    :param copy_tree: return a copy that can be modified, otherwise the cached tree
+    :type copy_tree: bool
+    :return: parsed SVG
+    :rtype: lxml.etree._ElementTree
+    """
+    filename = str(filename)
+    tree = _parse(filename, os.stat(filename).st_mtime_ns)
+    return copy.deepcopy(tree) if copy_tree else tree
+
+
+def mermaid_body(root):
+    """Returns (body, width, height) of an SVG root for the iconify JSON used by Mermaid
+
+    The body is the SVG's children without the title and namespace declarations.
+    """
+    width = int(root.get("width").strip("px"))
+    height = int(root.get("height").strip("px"))
+    body = "".join(
+        (
+            ET.tostring(child, encoding="unicode", method="xml")
+            for child in root
+            if child.tag != f"{{{SVG_NAMESPACE}}}title"
+        )
+    )
+    # Remove any remaining xmlns declrations
+    body = re.sub(r'\sxmlns[^"]*"[^"]*"', "", body)
+    return (body, width, height)
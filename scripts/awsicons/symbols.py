@@ -0,0 +1,79 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Index of the symbols defined by each generated .puml file
+"""
+
+import json
+
+SYMBOL_INDEX_FILENAME = "aws-icons-symbols.json"
+
+
+class SymbolIndex:
+    """Maps each icon's Target, Target2 and <Target>Participant or <Target>Group
+    macro to its .puml file, relative to dist/
+
+    A symbol already in the index keeps its first file.
+
+    :param version: release the index is for
+    :type version: str
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        # category -> all.puml path
+        self.categories = {}
+        # symbol -> .puml path
+        self.symbols = {}
+
+    def add(self, category, target, target2=None, group=False):
+        """Add the symbols of an icon of category"""
+        path = f"{category}/{target}.puml"
+        self.categories.setdefault(category, f"{category}/all.puml")
+        macro = f"{target}Group" if group else f"{target}Participant"
+        for symbol in (target, target2, macro):
+            if symbol:
+                self.symbols.setdefault(symbol, path)
+
+    def lookup(self, symbol):
+        """Returns the .puml path defining symbol, or None"""
+        return self.symbols.get(symbol)
+
+    def as_dict(self):
+        """Returns the index as a JSON serializable dict"""
+        return {
+            "version": self.version,
+            "categories": self.categories,
+            "symbols": self.symbols,
+        }
+
+    def write(self, path):
+        """Write the index as compact JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def from_config(cls, config, version=None):
+        """Returns the index of the icons in a loaded config.yml, in the order
+        icon-builder.py adds them"""
+        index = cls(version)
+        for category in sorted(config["Categories"]):
+            icons = config["Categories"][category].get("Icons") or []
+            for icon in sorted(icons, key=lambda i: i["Target"]):
+                index.add(
+                    category,
+                    icon["Target"],
+                    icon.get("Target2"),
+                    group=category == "Groups",
+                )
+        return index
+
+    @classmethod
+    def load(cls, path):
+        """Returns the index read from a file written by write()"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(data.get("version"))
+        index.categories = data["categories"]
+        index.symbols = data["symbols"]
+        return index
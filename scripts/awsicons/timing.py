@@ -0,0 +1,140 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Per-stage and per-icon timings for icon-builder.py --profile
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from awsicons.jvm import daemon_cpu_time
+
+
+def _sample(children=True):
+    subprocess_cpu = daemon_cpu_time()
+    if children:
+        times = os.times()
+        subprocess_cpu += times.children_user + times.children_system
+    return (time.perf_counter(), time.process_time(), subprocess_cpu)
+
+
+class StageTimer:
+    """Wall, CPU and subprocess CPU seconds of named stages
+
+    Subprocess time covers waited-for children (e.g. rsvg-convert) and the
+    running JVM daemons. Time spent in a stage entered more than once is
+    added up. A disabled timer records nothing.
+
+    :param enabled: record timings
+    :type enabled: bool
+    :param children: count waited-for children, False where they are Pool
+        workers that time themselves
+    :type children: bool
+    """
+
+    def __init__(self, enabled=True, children=True):
+        self.enabled = enabled
+        self.children = children
+        # stage name -> {"wall", "cpu", "subprocess_cpu", "count"}
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as stage name"""
+        if not self.enabled:
+            yield
+            return
+        start = _sample(self.children)
+        try:
+            yield
+        finally:
+            end = _sample(self.children)
+            entry = self.stages.setdefault(
+                name, {"wall": 0.0, "cpu": 0.0, "subprocess_cpu": 0.0, "count": 0}
+            )
+            entry["wall"] += end[0] - start[0]
+            entry["cpu"] += end[1] - start[1]
+            entry["subprocess_cpu"] += end[2] - start[2]
+            entry["count"] += 1
+
+    def merge(self, stages, prefix=""):
+        """Add the stages of another timer, with names prefixed by prefix"""
+        for name, timing in stages.items():
+            entry = self.stages.setdefault(
+                prefix + name,
+                {"wall": 0.0, "cpu": 0.0, "subprocess_cpu": 0.0, "count": 0},
+            )
+            for key, value in timing.items():
+                entry[key] += value
+
+
+class ProfileReport:
+    """Timings of the build stages in the main process and of every icon in the workers
+
+    Icon stages are also summed into ``icon:<stage>`` totals, which add up the
+    time of all workers and so can exceed the wall time of the build. The
+    main process's subprocess time leaves out the reaped Pool workers, whose
+    time is already in the icon stages.
+    """
+
+    def __init__(self):
+        self.timer = StageTimer(children=False)
+        # icon source filename -> {"category", "target", "stages"}
+        self.icons = {}
+
+    def add_icon(self, filename, category, target, stages):
+        """Record the stages timed by a worker for an icon"""
+        self.icons[filename] = {
+            "category": category,
+            "target": target,
+            "stages": stages,
+        }
+
+    def as_dict(self):
+        """Returns the report as a JSON serializable dict"""
+        icon_totals = StageTimer()
+        for icon in self.icons.values():
+            icon_totals.merge(icon["stages"], prefix="icon:")
+        return {
+            "stages": self.timer.stages,
+            "icon_stages": icon_totals.stages,
+            "icons": {
+                filename: {**icon, "wall": _total(icon["stages"], "wall")}
+                for filename, icon in self.icons.items()
+            },
+        }
+
+    def write(self, path):
+        """Write the report as JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def lines(self, top=10):
+        """Returns the summary as printable lines, slowest stages and icons first"""
+        report = self.as_dict()
+        lines = [
+            f"{'Stage':<32} {'Count':>6} {'Wall s':>9} {'CPU s':>9} {'Subproc s':>9}"
+        ]
+        stages = {**report["stages"], **report["icon_stages"]}
+        for name, timing in sorted(stages.items(), key=lambda s: -s[1]["wall"]):
+            lines.append(
+                f"{name:<32} {timing['count']:>6} {timing['wall']:>9.3f} "
+                f"{timing['cpu']:>9.3f} {timing['subprocess_cpu']:>9.3f}"
+            )
+        lines.append("")
+        lines.append(f"{'Slowest icons':<48} {'Wall s':>9}  Slowest stage")
+        icons = sorted(report["icons"].values(), key=lambda i: -i["wall"])
+        for icon in icons[:top]:
+            slowest = max(
+                icon["stages"], key=lambda s: icon["stages"][s]["wall"], default="-"
+            )
+            lines.append(
+                f"{icon['category'] + '/' + icon['target']:<48} {icon['wall']:>9.3f}  {slowest}"
+            )
+        return lines
+
+
+def _total(stages, key):
+    return sum(timing[key] for timing in stages.values())
@@ -0,0 +1,112 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+"""
+Write-behind output of generated files to dist/
+"""
+
+import hashlib
+import os
+import queue
+import threading
+from pathlib import Path
+
+
+class WriteBehind:
+    """Writes files on a background thread so producers do not wait on the file system
+
+    Files are queued as dicts of relative path -> bytes and written in batches
+    of whatever is waiting. The queue is bounded, so ``write`` blocks when the
+    writer falls behind. Written files are fsynced once, when the writer is
+    closed. The SHA-256 of each file is kept in ``digests``, so StagedDir can
+    compare them without reading the files back.
+
+    :param root: directory the relative paths are written under
+    :type root: pathlib.Path
+    :param max_pending: number of queued dicts before write blocks
+    :type max_pending: int
+    :param fsync: fsync written files and their directories on close
+    :type fsync: bool
+    """
+
+    def __init__(self, root, max_pending=64, fsync=True):
+        self.root = Path(root)
+        self.fsync = fsync
+        self.written = []
+        # relative path -> SHA-256 hex digest of the written contents
+        self.digests = {}
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, files):
+        """Queue a dict of relative path -> bytes, blocks while the queue is full
+
+        Write errors are raised by ``flush`` and ``close``, files queued after
+        an error are dropped.
+        """
+        self._queue.put(files)
+
+    def flush(self):
+        """Wait until every queued file has been written"""
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """Write any queued files, stop the thread and fsync what was written"""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        if self.fsync:
+            self._fsync()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            # take whatever else is already waiting
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for files in batch:
+                if files is None:
+                    stop = True
+                elif self._error is None:
+                    try:
+                        self._write(files)
+                    except OSError as e:
+                        self._error = e
+                self._queue.task_done()
+
+    def _write(self, files):
+        for name, contents in files.items():
+            path = self.root / name
+            path.write_bytes(contents)
+            self.written.append(path)
+            self.digests[Path(name).as_posix()] = hashlib.sha256(contents).hexdigest()
+
+    def _fsync(self):
+        directories = set()
+        for path in self.written:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            directories.add(path.parent)
+        for directory in sorted(directories):
+            fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+
+"""benchmark.py: Time the icon-builder.py pipeline on synthetic icon trees"""
+
+import argparse
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+from PIL import Image, ImageDraw
+
+_SCRIPTS_DIR = Path(__file__).resolve().parent
+_REPO_DIR = _SCRIPTS_DIR.parent
+
+# Builder files linked into the benchmark workspace, config.yml is generated
+WORKSPACE_LINKS = [
+    "icon-builder.py",
+    "awsicons",
+    "batik-1.16",
+    "plantuml-mit-1.2026.2.jar",
+]
+
+# Source directories matching the dir_list globs in icon-builder.py
+CATEGORY_DIR = "Category-Icons_01302026/Arch-Category_48"
+SERVICE_DIR = "Architecture-Service-Icons_01302026/Arch_{category}/48"
+RESOURCE_DIR = "Resource-Icons_01302026/Res_{category}"
+
+# icon-builder.py arguments for each tools mode
+TOOLS = {
+    # Batik and the PlantUML sprite encoder in JVMs
+    "real": [],
+    # No Java: resvg and the native sprite encoder, with a stub java for the environment check
+    "stub": ["--rasterizer", "resvg", "--sprite-encoder", "native"],
+}
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_RESULTS = "benchmark-results.jsonl"
+
+
+def synthetic_svg(index: int, color: str) -> str:
+    """Returns a 48x48 icon SVG with a shape that differs per index"""
+    x, y = 6 + index % 13, 6 + (index // 13) % 13
+    radius = 4 + index % 9
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<svg width="48px" height="48px" viewBox="0 0 48 48" version="1.1" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">
+    <title>Icon-{index}</title>
+    <g id="Icon-{index}" stroke="none" stroke-width="1" fill="none" fill-rule="evenodd">
+        <path d="M{x}.25,{y}.5 L{x + 20}.75,{y}.125 L{x + 10}.5,{y + 22}.375 Z" fill="{color}"></path>
+        <circle cx="{24 + index % 7}" cy="{24 + index % 5}" r="{radius}" fill="#232F3E"></circle>
+    </g>
+</svg>
+"""
+
+
+def synthetic_png(path: Path, index: int, color: str) -> None:
+    """Write a 48x48 icon PNG with a shape that differs per index"""
+    image = Image.new("RGB", (48, 48), color)
+    draw = ImageDraw.Draw(image)
+    x, y = 6 + index % 13, 6 + (index // 13) % 13
+    draw.polygon([(x, y), (x + 20, y), (x + 10, y + 22)], fill="#FFFFFF")
+    image.save(path)
+
+
+def make_corpus(root: Path, count: int, base_config: dict) -> dict:
+    """Create count synthetic icons under root/source/official, returns their config.yml
+
+    Icons are spread over the categories of base_config. Each category gets a
+    category icon, then two in five icons are service PNGs (with the sibling SVG
+    used for Mermaid) and the rest resource SVGs, as in the AWS asset package.
+    """
+    official = root / "source" / "official"
+    colors = base_config["Defaults"]["Colors"]
+    categories = {
+        name: category
+        for name, category in base_config["Categories"].items()
+        if name != "Groups"
+    }
+    names = list(categories)
+    config = {"Defaults": base_config["Defaults"], "Categories": {}}
+    for index in range(count):
+        category = names[index % len(names)]
+        color = colors.get(categories[category].get("Color"), "#232F3E")
+        entry = config["Categories"].setdefault(
+            category, {"Color": categories[category].get("Color"), "Icons": []}
+        )
+        if index < len(names):
+            source_dir = CATEGORY_DIR
+            source = f"Arch-Category_{category}_48.png"
+            target, target2 = category, category.lower()
+        elif index % 5 < 2:
+            source_dir = SERVICE_DIR.format(category=category)
+            source = f"Arch_Amazon-Bench-{index:05d}_48.png"
+            target, target2 = f"Bench{index:05d}", f"bench-{index:05d}"
+        else:
+            source_dir = RESOURCE_DIR.format(category=category)
+            source = f"Res_Amazon-Bench-{index:05d}_48.svg"
+            target, target2 = f"BenchResource{index:05d}", f"bench-resource-{index:05d}"
+        path = official / source_dir / source
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if source.endswith(".png"):
+            synthetic_png(path, index, color)
+            path.with_suffix(".svg").write_text(
+                synthetic_svg(index, color), encoding="utf-8"
+            )
+        else:
+            path.write_text(synthetic_svg(index, color), encoding="utf-8")
+        entry["Icons"].append(
+            {
+                "Source": source,
+                "SourceDir": source_dir,
+                "Target": target,
+                "Target2": target2,
+            }
+        )
+    return config
+
+
+def make_workspace(parent: Path, count: int, tools: str) -> Path:
+    """Create an aws-icons-for-plantuml workspace with count synthetic icons
+
+    Returns the workspace scripts/ directory to run icon-builder.py from.
+    """
+    root = parent / "aws-icons-for-plantuml"
+    scripts = root / "scripts"
+    scripts.mkdir(parents=True)
+    for name in WORKSPACE_LINKS:
+        if (_SCRIPTS_DIR / name).exists():
+            (scripts / name).symlink_to(_SCRIPTS_DIR / name)
+    source = root / "source"
+    source.mkdir()
+    for puml in (_REPO_DIR / "source").glob("*.puml"):
+        shutil.copy(puml, source)
+
+    with open(_SCRIPTS_DIR / "config.yml", encoding="utf-8") as f:
+        base_config = yaml.safe_load(f)
+    config = make_corpus(root, count, base_config)
+    with open(scripts / "config.yml", "w", encoding="utf-8") as f:
+        yaml.dump(config, f, default_flow_style=False)
+
+    if tools == "stub":
+        # only the environment check runs java in this mode
+        stub_bin = root / "bin"
+        stub_bin.mkdir()
+        java = stub_bin / "java"
+        java.write_text("#!/bin/sh\nexit 0\n", encoding="utf-8")
+        java.chmod(java.stat().st_mode | stat.S_IXUSR)
+    return scripts
+
+
+def run_builder(scripts: Path, tools: str, profile: Path) -> float:
+    """Run icon-builder.py --profile in a workspace, returns the wall seconds"""
+    env = dict(os.environ)
+    stub_bin = scripts.parent / "bin"
+    if stub_bin.exists():
+        env["PATH"] = f"{stub_bin}{os.pathsep}{env.get('PATH', '')}"
+    command = [
+        sys.executable,
+        "icon-builder.py",
+        "--cache-dir",
+        ".build-cache",
+        "--profile",
+        str(profile),
+        *TOOLS[tools],
+    ]
+    start = time.perf_counter()
+    result = subprocess.run(
+        command, cwd=scripts, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0 or not profile.exists():
+        print(result.stdout.decode("utf-8", errors="replace")[-2000:])
+        print(f"Error: icon-builder.py failed in {scripts}")
+        sys.exit(1)
+    return wall
+
+
+def git_revision() -> str:
+    """Returns the short commit of the repository, with -dirty for local changes"""
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=_REPO_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return result.stdout.decode("utf-8").strip()
+
+
+def make_record(count: int, tools: str, run: str, wall: float, profile: dict) -> dict:
+    """Returns the result record of one builder run"""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "icons": count,
+        "tools": tools,
+        "run": run,
+        "wall": round(wall, 3),
+        "icons_per_second": round(count / wall, 2),
+        "stages": {
+            name: round(timing["wall"], 3)
+            for name, timing in {
+                **profile["stages"],
+                **profile["icon_stages"],
+            }.items()
+        },
+    }
+
+
+def load_results(path: Path) -> list[dict]:
+    """Returns the records of previous benchmark runs"""
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(record: dict, previous: list[dict], max_regression: float) -> str | None:
+    """Returns a message if throughput dropped by more than max_regression percent
+    against the last record of the same size, tools and run, otherwise None"""
+    matching = [
+        r
+        for r in previous
+        if (r["icons"], r["tools"], r["run"])
+        == (record["icons"], record["tools"], record["run"])
+    ]
+    if not matching:
+        return None
+    baseline = matching[-1]
+    change = (
+        (record["icons_per_second"] - baseline["icons_per_second"])
+        / baseline["icons_per_second"]
+        * 100
+    )
+    if change >= -max_regression:
+        return None
+    return (
+        f"{record['icons']} icons {record['tools']} {record['run']}: "
+        f"{record['icons_per_second']} icons/s, {change:.1f}% against "
+        f"{baseline['icons_per_second']} icons/s at {baseline['revision']}"
+    )
+
+
+def main() -> None:
+    """Entry point for the benchmark suite."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark icon-builder.py on synthetic icon trees"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help=f"Numbers of icons to build (default: {' '.join(map(str, DEFAULT_SIZES))})",
+    )
+    parser.add_argument(
+        "--tools",
+        choices=sorted(TOOLS),
+        default="real",
+        help="real: Batik and PlantUML JVMs, stub: no Java, resvg and the native sprite encoder (default: real)",
+    )
+    parser.add_argument(
+        "--results",
+        default=DEFAULT_RESULTS,
+        help=f"JSON lines file the results are appended to (default: {DEFAULT_RESULTS})",
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=10.0,
+        help="Exit with an error when throughput drops by more than this percent against the previous result (default: 10)",
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        default=False,
+        help="Keep the generated workspaces",
+    )
+    args = parser.parse_args()
+
+    results_path = Path(args.results)
+    previous = load_results(results_path)
+    regressions = []
+    print(f"{'Icons':>6} {'Run':<5} {'Wall s':>9} {'Icons/s':>9}  Slowest stages")
+    for count in args.sizes:
+        parent = Path(tempfile.mkdtemp(prefix=f"benchmark-{count}-"))
+        scripts = make_workspace(parent, count, args.tools)
+        # a cold build fills the workspace build cache, the warm build restores from it
+        for run in ("cold", "warm"):
+            profile_path = parent / f"profile-{run}.json"
+            wall = run_builder(scripts, args.tools, profile_path)
+            with open(profile_path, encoding="utf-8") as f:
+                profile = json.load(f)
+            record = make_record(count, args.tools, run, wall, profile)
+            slowest = sorted(record["stages"].items(), key=lambda s: -s[1])[:3]
+            print(
+                f"{count:>6} {run:<5} {record['wall']:>9.3f} {record['icons_per_second']:>9.2f}  "
+                + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in slowest)
+            )
+            message = compare(record, previous, args.max_regression)
+            if message is not None:
+                regressions.append(message)
+            with open(results_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        if args.keep:
+            print(f"Workspace kept in {parent}")
+        else:
+            shutil.rmtree(parent)
+
+    print(f"Results appended to {results_path}")
+    if regressions:
+        print("Throughput regressions:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
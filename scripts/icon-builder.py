@@ -6,23 +6,36 @@
 """icon-builder.py: Build AWS Icons for PlantUML"""
 
 import argparse
+import hashlib
 import json
 import multiprocessing
-import os
-import re
 import shutil
 import subprocess
 import sys
-import xml.etree.ElementTree as ET
+import time
 from collections import OrderedDict, defaultdict
+from contextlib import nullcontext
 from datetime import datetime, timezone
 from multiprocessing import Pool
 from pathlib import Path
 from subprocess import PIPE
 
 import yaml
+from awsicons.cache import DEFAULT_CACHE_DIR, BuildCache, jar_stamps
+from awsicons.config_index import ConfigIndex
 from awsicons.icon import Icon
-from lxml import etree
+from awsicons.jsonstream import JsonWriter, Spool
+from awsicons.jvm import BATIK_DIR
+from awsicons.lite import LITE_LEVELS, LITE_SUFFIX, IncludeSizeReport, split_lite
+from awsicons.mermaid import MermaidShards, SizeReport, round_coordinates
+from awsicons.png import PngSizeReport, optimize_files
+from awsicons.rasterizer import RASTERIZERS, get_rasterizer, pixel_diff
+from awsicons.scheduler import TimingHistory, estimate_cost, schedule
+from awsicons.sprite import PLANTUML_JAR
+from awsicons.staging import StagedDir
+from awsicons.symbols import SYMBOL_INDEX_FILENAME, SymbolIndex
+from awsicons.timing import ProfileReport, StageTimer
+from awsicons.writer import WriteBehind
 
 # TODO - refactor to param file and/or arguments
 
@@ -544,11 +557,24 @@ Category | PUML Macros (Name) | Image (PNG) | PUML Url
  --- | --- | :---: | ---
 """
 
+# Mean per-channel difference (0-255) from Batik accepted by --compare-rasterizer,
+# anti-aliased edges differ slightly between renderers
+RASTERIZER_MAX_MEAN_DELTA = 1.0
+
 PUML_COPYRIGHT = """'Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
 'SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
 
 """
 
+
+def non_negative_int(value):
+    """argparse type for an integer of 0 or more"""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, not {number}")
+    return number
+
+
 parser = argparse.ArgumentParser(description="Generates AWS icons for PlantUML")
 parser.add_argument(
     "--check-env",
@@ -566,7 +592,7 @@ parser.add_argument(
     "--symbols-only",
     action="store_true",
     default=False,
-    help="Only generates the AWSSymbols.md. Structuriz theme, and Mermaid JSON files",
+    help="Only generates the AWSSymbols.md. Structuriz theme, symbol index, and Mermaid JSON files",
 )
 parser.add_argument(
     "--create-color-json",
@@ -574,6 +600,76 @@ parser.add_argument(
     default=False,
     help="Prints AWS Colors JSON to stdout",
 )
+parser.add_argument(
+    "--sprite-encoder",
+    choices=["plantuml", "native"],
+    default="plantuml",
+    help="Encode sprites with the PlantUML jar (default) or natively in Python without Java",
+)
+parser.add_argument(
+    "--rasterizer",
+    choices=sorted(RASTERIZERS),
+    default="batik",
+    help="SVG rasterizer: batik (default), resvg in-process (requires resvg-py), or rsvg-convert",
+)
+parser.add_argument(
+    "--compare-rasterizer",
+    action="store_true",
+    default=False,
+    help="Render every icon with --rasterizer and Batik, report pixel differences, and exit",
+)
+parser.add_argument(
+    "--mermaid-compact",
+    action="store_true",
+    default=False,
+    help="Write a minified aws-icons-mermaid.json with rounded coordinates and aliases for identical icons, and print a size report",
+)
+parser.add_argument(
+    "--mermaid-precision",
+    type=non_negative_int,
+    default=2,
+    help="Decimal places kept in Mermaid path coordinates with --mermaid-compact (default: 2)",
+)
+parser.add_argument(
+    "--no-cache",
+    action="store_true",
+    default=False,
+    help="Regenerate every icon instead of restoring unchanged icons from the build cache",
+)
+parser.add_argument(
+    "--cache-dir",
+    default=DEFAULT_CACHE_DIR,
+    help=f"Build cache directory (default: scripts/{DEFAULT_CACHE_DIR})",
+)
+parser.add_argument(
+    "--optimize-png",
+    action="store_true",
+    default=False,
+    help="Losslessly recompress the generated PNGs, also embedded in the .puml files, and print the bytes saved per category",
+)
+parser.add_argument(
+    "--split-img",
+    action="store_true",
+    default=False,
+    help="Write the base64 PNG of each icon to <Target>IMG.puml (and allIMG.puml per category) instead of inlining it, $<Target>IMG() returns the sprite unless it is included",
+)
+parser.add_argument(
+    "--lite",
+    nargs="?",
+    const="16z",
+    default=None,
+    choices=LITE_LEVELS,
+    metavar="DEPTH",
+    help="Also write a dist-lite/ tree with only sprites of DEPTH (4z, 8z or 16z, default: 16z) and entity macros, and print the all.puml sizes",
+)
+parser.add_argument(
+    "--profile",
+    nargs="?",
+    const="icon-builder-profile.json",
+    default=None,
+    metavar="FILE",
+    help="Time each build stage and icon, print the slowest and write a JSON report (default: icon-builder-profile.json)",
+)
 parser.add_argument(
     "--validate-config",
     action="store_true",
@@ -582,6 +678,7 @@ parser.add_argument(
 )
 args = vars(parser.parse_args())
 config = {}
+build_cache = None
 
 
 def verify_environment():
@@ -633,6 +730,14 @@ def verify_environment():
         print(f"Error executing plantuml jar file, {e}")
         sys.exit(1)
 
+    # Verify the selected rasterizer can be loaded
+    if args["rasterizer"] != "batik":
+        try:
+            get_rasterizer(args["rasterizer"])
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"Error loading {args['rasterizer']} rasterizer, {e}")
+            sys.exit(1)
+
     # Checks complete, return if not doing a pre-flight
     if args["check_env"]:
         # dry run only
@@ -641,18 +746,10 @@ def verify_environment():
     return
 
 
-def clean_dist():
-    """Removes all files from the dist/ directory"""
-    path = Path("..") / "dist"
-    if path.exists():
-        shutil.rmtree(path)
-    os.mkdir(path)
-
-
-def copy_puml():
-    """Copy source/*.puml files to dist"""
+def copy_puml(dist_dir):
+    """Copy source/*.puml files to dist_dir"""
     for file in Path(".").glob("../source/*.puml"):
-        shutil.copy(file, Path("..") / "dist")
+        shutil.copy(file, dist_dir)
 
 
 def build_file_list(file_dir: str, glob: str):
@@ -769,86 +866,347 @@ def create_config_template():
     sys.exit(0)
 
 
-def create_category_all_file(path):
-    """Create an 'all.puml' file with contents of files in path"""
-    data = ""
-    for f in sorted(path.glob("*.puml")):
-        with open(f, "r", encoding="utf-8") as read_file:
-            data += read_file.read() + "\n"
+def create_category_all_file(task):
+    """Create an 'all.puml' file with contents of files in path
+
+    task is (path, split_img). With split_img the <Target>IMG.puml image files
+    are combined into 'allIMG.puml' instead, it is False for dist-lite/, which
+    has no image files.
+    """
+    path, split_img = task
+    path = Path(path)
+    members = sorted(
+        f for f in path.glob("*.puml") if f.name not in ("all.puml", "allIMG.puml")
+    )
+    if split_img:
+        write_all_file(
+            path / "allIMG.puml", [f for f in members if f.name.endswith("IMG.puml")]
+        )
+        members = [f for f in members if not f.name.endswith("IMG.puml")]
+    write_all_file(path / "all.puml", members)
+
+
+def write_all_file(all_path, members):
+    """Combine the member .puml files into all_path
+
+    The member files are streamed without their individual copyright statements.
+    With the build cache, a file whose members are unchanged is restored instead.
+    """
+    key = None
+    if build_cache is not None:
+        key = build_cache.files_key(members, PUML_COPYRIGHT)
+        cached = build_cache.restore(key)
+        if cached is not None:
+            print(f"restoring {all_path} from build cache")
+            all_path.write_bytes(cached[0][all_path.name])
+            return
+
     # Filter out individual copyright statements and add single copyright to top of file
-    content = ""
-    for line in data.splitlines():
-        if not line.startswith("'"):
-            content += line + "\n"
-    content = PUML_COPYRIGHT + content
-
-    with open(f"{path}/all.puml", "w", encoding="utf-8") as all_file:
-        all_file.write(content)
-    return
+    with open(all_path, "w", encoding="utf-8") as all_file:
+        all_file.write(PUML_COPYRIGHT)
+        for f in members:
+            with open(f, "r", encoding="utf-8") as read_file:
+                lines = read_file.read().splitlines()
+            all_file.writelines(
+                line + "\n" for line in lines if not line.startswith("'")
+            )
+            all_file.write("\n")
+    if key is not None:
+        build_cache.store(key, {all_path.name: all_path.read_bytes()})
 
 
-def build_mermaid_icon(mermaid, svg_filename, cat, mermaid_target):
-    """add an icon to the mermaid object"""
-    svg_parser = etree.XMLParser(remove_blank_text=True)
-    svg_tree = etree.parse(svg_filename, svg_parser)
-    svg_root = svg_tree.getroot()
-    svg_width = svg_root.get("width").strip("px")
-    svg_height = svg_root.get("height").strip("px")
-    # Register the SVG namespace to avoid automatic namespace additions
-    ET.register_namespace("", "http://www.w3.org/2000/svg")
-    ET.register_namespace("xlink", "http://www.w3.org/1999/xlink")
-    svg_body = "".join(
-        (
-            ET.tostring(child, encoding="unicode", method="xml")
-            for child in svg_root
-            if child.tag != "{http://www.w3.org/2000/svg}title"
-        )
-    )
-    # Remove any remaining xmlns declrations
-    svg_body = re.sub(r'\sxmlns[^"]*"[^"]*"', "", svg_body)
+def build_mermaid_icon(mermaid, mermaid_icons, cat, fragment):
+    """add an icon fragment (name, body reference, width, height) to the mermaid object,
+    the body stays in the spool until the icons are written"""
+    mermaid_target, body_ref, svg_width, svg_height = fragment
 
     mermaid["info"]["total"] = mermaid["info"]["total"] + 1
     if mermaid["categories"].get(cat) is None:
         mermaid["categories"][cat] = []
     mermaid["categories"][cat].append(mermaid_target)
-    mermaid["icons"][mermaid_target] = {
-        "body": svg_body,
+    mermaid_icons[mermaid_target] = (body_ref, svg_width, svg_height)
+
+
+def write_mermaid(mermaid, mermaid_icons, spool, dist_dir, compact=False, precision=2):
+    """Write aws-icons-mermaid.json and the per-category shards in aws-icons-mermaid/,
+    reading each icon body from the spool as it is written
+
+    In compact mode the JSON is minified, path coordinates are rounded to precision
+    decimal places, icons identical to an earlier one are written as iconify
+    aliases, and a compressed size report per category is printed.
+    """
+    path = dist_dir / "aws-icons-mermaid.json"
+    shard_path = dist_dir / "aws-icons-mermaid"
+    if shard_path.exists():
+        shutil.rmtree(shard_path)
+    shard_path.mkdir()
+    shards = MermaidShards(
+        shard_path,
+        {
+            key: value
+            for key, value in mermaid.items()
+            if key not in ("icons", "categories")
+        },
+        indent=None if compact else 2,
+    )
+    icon_categories = {
+        name: cat for cat, names in mermaid["categories"].items() for name in names
     }
-    if mermaid["width"] != int(svg_width):
-        mermaid["icons"][mermaid_target]["width"] = int(svg_width)
-    if mermaid["height"] != int(svg_height):
-        mermaid["icons"][mermaid_target]["height"] = int(svg_height)
+    report = SizeReport() if compact else None
+    # digest of (body, width, height) -> first icon name, to alias repeats
+    parents = {}
+    aliases = {}
+    with open(path, "w", encoding="utf-8") as f:
+        writer = JsonWriter(f, indent=None if compact else 2)
+        writer.begin_object()
+        for key, value in mermaid.items():
+            if key != "icons":
+                writer.value(value, key)
+                continue
+            writer.begin_object(key)
+            for mermaid_target, (
+                body_ref,
+                svg_width,
+                svg_height,
+            ) in mermaid_icons.items():
+                body = spool.read(body_ref)
+                mermaid_icon = {"body": body}
+                if mermaid["width"] != svg_width:
+                    mermaid_icon["width"] = svg_width
+                if mermaid["height"] != svg_height:
+                    mermaid_icon["height"] = svg_height
+                parent = None
+                if compact:
+                    mermaid_icon["body"] = round_coordinates(body, precision)
+                    digest = hashlib.sha256(
+                        json.dumps(mermaid_icon, sort_keys=True).encode("utf-8")
+                    ).digest()
+                    parent = parents.setdefault(digest, mermaid_target)
+                    if parent == mermaid_target:
+                        parent = None
+                shards.add(
+                    icon_categories[mermaid_target],
+                    mermaid_target,
+                    mermaid_icon,
+                    parent,
+                )
+                if parent is not None:
+                    aliases[mermaid_target] = {"parent": parent}
+                    continue
+                writer.value(mermaid_icon, mermaid_target)
+                if report is not None:
+                    report.add(
+                        icon_categories[mermaid_target],
+                        json.dumps(
+                            {mermaid_target: mermaid_icon}, separators=(",", ":")
+                        ),
+                    )
+            writer.end()
+            if aliases:
+                writer.value(aliases, "aliases")
+        writer.end()
+    shards.close()
+
+    if report is not None:
+        for mermaid_target, alias in aliases.items():
+            report.add(
+                icon_categories[mermaid_target],
+                json.dumps({mermaid_target: alias}, separators=(",", ":")),
+            )
+        print(f"Mermaid icons written as aliases of identical icons: {len(aliases)}")
+        for line in report.lines(path.stat().st_size):
+            print(line)
+
+
+def write_structurizr_theme(structurizr, dist_dir):
+    """Write aws-icons-structurizr-theme.json one element at a time"""
+    with open(
+        dist_dir / "aws-icons-structurizr-theme.json", "w", encoding="utf-8"
+    ) as f:
+        writer = JsonWriter(f, indent=2)
+        writer.begin_object()
+        for key, value in structurizr.items():
+            if key != "elements":
+                writer.value(value, key)
+                continue
+            writer.begin_array(key)
+            for element in value:
+                writer.value(element)
+            writer.end()
+        writer.end()
+
+
+def make_build_cache(build_args):
+    """Returns the BuildCache for the arguments, None with --no-cache"""
+    if build_args["no_cache"]:
+        return None
+    return BuildCache(
+        build_args["cache_dir"],
+        tool_versions={
+            "batik": jar_stamps(BATIK_DIR),
+            "plantuml": jar_stamps(PLANTUML_JAR),
+            "sprite_encoder": build_args["sprite_encoder"],
+            "rasterizer": build_args["rasterizer"],
+            "optimize_png": build_args["optimize_png"],
+            "split_img": build_args["split_img"],
+            "lite": build_args["lite"],
+        },
+    )
+
+
+def init_worker(worker_args):
+    """Pool initializer, sets up the per-process state shared by all tasks"""
+    global args, build_cache  # pylint: disable=global-statement
+    args = worker_args
+    build_cache = make_build_cache(args)
+
 
+def worker(task):
+    """multiprocess resource intensive operations (java subprocess)
 
-def worker(icon):
-    """multiprocess resource intensive operations (java subprocess)"""
-    dist_path = Path("..") / "dist" / icon.category
+    Returns (files, lite_files, fragments, timings, png_sizes): the generated
+    files as dicts of path relative to dist/ and dist-lite/ -> bytes, for main()
+    to hand to the write-behind writers, the icon's Mermaid fragments to merge
+    into aws-icons-mermaid.json, the stage timings with --profile and the (PNGs,
+    bytes before, bytes after) of --optimize-png, otherwise None
+    """
+    timer = StageTimer(enabled=args["profile"] is not None)
+    icon = Icon.from_task(task)
+    if build_cache is not None:
+        with timer.stage("cache"):
+            key = build_cache.key(icon)
+            cached = build_cache.restore(key)
+        if cached is not None:
+            files, data = cached
+            print(f"restoring {icon.source_name} from build cache")
+            data = data or {}
+            with timer.stage("mermaid"):
+                if "mermaid" in data:
+                    mermaid_fragments = [
+                        tuple(fragment) for fragment in data["mermaid"]
+                    ]
+                else:
+                    mermaid_fragments = icon.generate_mermaid()
+            return (
+                *dist_files(icon, files),
+                mermaid_fragments,
+                timings(timer),
+                data.get("png_sizes"),
+            )
+
+    png_sizes = None
     if icon.skip_icon:
-        sprite = ""
+        sprite = lite_sprite = ""
+        files = {}
         print(f"skipping icon for {icon.source_name}")
     else:
-        # create images without transparency for use with PlantUML sprites
-        icon.generate_image(
-            dist_path,
-            color=True,
-            max_target_size=64,  # override to 64x64
-            # max_target_size=icon.target_size, # use for mix of 64x64 and 48x48
-            transparency=False,
-            gradient=True,
-        )
-        sprite = icon.generate_puml_sprite(dist_path)
-        # Recreate the images with transparency
-        icon.generate_images(
-            dist_path,
-            color=True,
-            max_target_size=64,  # override to 64x64
-            # max_target_size=icon.target_size, # use for mix of 64x64 and 48x48
-            transparency=icon.transparency,  # was True
-            gradient=False,
-        )
+        # The sprite needs an image without transparency, rendered together with the
+        # images with transparency that are kept in memory for the PUML file
+        with timer.stage("render"):
+            sprite_png, files = icon.generate_sprite_and_images(
+                max_target_size=64,  # override to 64x64
+                # max_target_size=icon.target_size, # use for mix of 64x64 and 48x48
+                rasterizer=args["rasterizer"],
+            )
+        with timer.stage("sprite"):
+            sprite = icon.generate_puml_sprite(
+                sprite_png, plantuml=args["sprite_encoder"] == "plantuml"
+            )
+            lite_sprite = sprite
+            if args["lite"] not in (None, "16z"):
+                lite_sprite = icon.generate_puml_sprite(
+                    sprite_png,
+                    plantuml=args["sprite_encoder"] == "plantuml",
+                    level=args["lite"],
+                )
+        if args["optimize_png"]:
+            # before the PUML file, which embeds the PNGs
+            with timer.stage("optimize"):
+                png_sizes = optimize_files(files)
     print(f"generating PUML for {icon.source_name}")
-    icon.generate_puml(dist_path, sprite)
-    return
+    with timer.stage("puml"):
+        if args["split_img"] and not icon.skip_icon:
+            files[f"{icon.target}IMG.puml"] = icon.generate_puml_img(files).encode(
+                "utf-8"
+            )
+        files[f"{icon.target}.puml"] = icon.generate_puml(
+            sprite, files, split_img=args["split_img"]
+        ).encode("utf-8")
+        if args["lite"] is not None:
+            files[f"{icon.target}{LITE_SUFFIX}"] = icon.generate_puml(
+                lite_sprite, None, lite=True
+            ).encode("utf-8")
+    with timer.stage("mermaid"):
+        mermaid_fragments = icon.generate_mermaid()
+
+    if build_cache is not None:
+        with timer.stage("cache"):
+            data = {}
+            # Mermaid bodies of PNG sources come from a sibling SVG outside the cache key
+            sources = [icon.filename, icon.filename_dark]
+            if all(str(f).endswith(".svg") for f in sources if f is not None):
+                data["mermaid"] = mermaid_fragments
+            if png_sizes is not None:
+                data["png_sizes"] = png_sizes
+            build_cache.store(key, files, data or None)
+    return (*dist_files(icon, files), mermaid_fragments, timings(timer), png_sizes)
+
+
+def dist_files(icon, files):
+    """Returns an icon's dicts of filename -> bytes keyed by path relative to dist/
+    and to dist-lite/"""
+    dist, lite = split_lite(files)
+    return (
+        {f"{icon.category}/{name}": contents for name, contents in dist.items()},
+        {f"{icon.category}/{name}": contents for name, contents in lite.items()},
+    )
+
+
+def timings(timer):
+    """Returns the stages recorded by a worker's timer, None when not profiling"""
+    return timer.stages if timer.enabled else None
+
+
+def mermaid_worker(task):
+    """multiprocess Mermaid fragments only, used with --symbols-only
+
+    Returns the same (files, lite_files, fragments, timings, png_sizes) as
+    worker(), without files or PNGs
+    """
+    timer = StageTimer(enabled=args["profile"] is not None)
+    with timer.stage("mermaid"):
+        mermaid_fragments = Icon.from_task(task).generate_mermaid()
+    return ({}, {}, mermaid_fragments, timings(timer), None)
+
+
+def compare_rasterizer(icons, max_mean_delta=RASTERIZER_MAX_MEAN_DELTA):
+    """Render each SVG icon with the selected rasterizer and with Batik, and report
+    icons whose pixels differ on average by more than max_mean_delta
+
+    :return: list of (source_name, largest channel difference, mean channel difference)
+    :rtype: list
+    """
+    results = []
+    for icon in icons:
+        if icon.skip_icon or not str(icon.filename).endswith(".svg"):
+            continue
+        images = [
+            icon.generate_image(
+                color=True,
+                max_target_size=64,
+                transparency=icon.transparency,
+                gradient=False,
+                rasterizer=name,
+            )
+            for name in ("batik", args["rasterizer"])
+        ]
+        delta, mean_delta = pixel_diff(*images)
+        results.append((icon.source_name, delta, mean_delta))
+        if mean_delta > max_mean_delta:
+            print(
+                f"{icon.source_name}: mean difference {mean_delta:.2f}, max difference {delta}"
+            )
+    return results
 
 
 def validate_config():
@@ -1081,6 +1439,62 @@ def format_report(issues):
     return lines
 
 
+def run_chunk(func, tasks):
+    """Run func for each task of a chunk in a worker, returns [(seconds, result, error)]
+
+    A task that raises gets its error message and no result, the rest of the
+    chunk still runs.
+    """
+    results = []
+    for task in tasks:
+        start = time.perf_counter()
+        try:
+            result, error = func(task), None
+        except Exception as e:  # pylint: disable=broad-except
+            result, error = None, str(e)
+        results.append((time.perf_counter() - start, result, error))
+    return results
+
+
+def run_pool(func, tasks, callback=None, costs=None):
+    """Run func for each task in a Pool, tasks is a dict of name -> task
+
+    callback(name, result) is called in the main process as each result arrives.
+    With costs, a dict of name -> estimated seconds, the most expensive tasks are
+    submitted first and cheap ones in chunks. An error is printed against the
+    task that raised it. Returns the seconds each successful task took.
+    """
+    pool = Pool(
+        processes=multiprocessing.cpu_count(),
+        initializer=init_worker,
+        initargs=(args,),
+    )
+    chunks = [[name] for name in tasks] if costs is None else schedule(costs)
+    seconds = {}
+
+    def chunk_done(names, results):
+        for name, (elapsed, result, error) in zip(names, results):
+            if error is not None:
+                print(f"Error: {error} processing {name}")
+                continue
+            seconds[name] = elapsed
+            if callback is not None:
+                callback(name, result)
+
+    for names in chunks:
+        pool.apply_async(
+            run_chunk,
+            args=(func, [tasks[name] for name in names]),
+            callback=lambda results, names=names: chunk_done(names, results),
+            error_callback=lambda e, names=names: print(
+                f"Error: {e} processing {', '.join(names)}"
+            ),
+        )
+    pool.close()
+    pool.join()
+    return seconds
+
+
 def main():
 
     if args["validate_config"]:
@@ -1095,10 +1509,21 @@ def main():
 
     verify_environment()
 
+    profile = ProfileReport() if args["profile"] is not None else None
+    png_report = PngSizeReport()
+    timer = profile.timer if profile is not None else StageTimer(enabled=False)
+
     # Build icons from files
+    with timer.stage("discovery"):
+        sources = [
+            (icon_dir, filename)
+            for icon_dir in dir_list
+            for filename in build_file_list(icon_dir["dir"], icon_dir["dir_glob"])
+        ]
+    config_index = ConfigIndex(config)
     icons = []
-    for icon_dir in dir_list:
-        for filename in build_file_list(icon_dir["dir"], icon_dir["dir_glob"]):
+    with timer.stage("config"):
+        for icon_dir, filename in sources:
             icon = Icon(
                 posix_filename=filename,
                 config=config,
@@ -1106,6 +1531,7 @@ def main():
                 filename_regex=icon_dir["filename_regex"],
                 category_mappings=icon_dir["category_mappings"],
                 filename_mappings=icon_dir["filename_mappings"],
+                config_index=config_index,
             )
             if icon.category == "Uncategorized":
                 print(f"skipping Uncategorized {icon.source_name}")
@@ -1113,29 +1539,121 @@ def main():
                 icons.append(icon)
 
     categories = sorted({icon.category for icon in icons})
+    icon_tasks = {str(icon.filename): icon.task() for icon in icons}
+
+    # Mermaid bodies returned by the workers are spooled to a temporary file as they
+    # arrive and read back in sorted order when aws-icons-mermaid.json is written
+    spool = Spool()
+    mermaid_fragments = {}
+
+    def spool_fragments(filename, fragments):
+        mermaid_fragments[filename] = [
+            (name, spool.add(body), width, height)
+            for name, body, width, height in fragments
+        ]
 
+    def collect(filename, result, dist_writer=None, lite_writer=None):
+        """Handle a worker result as it arrives"""
+        files, lite_files, fragments, stages, png_sizes = result
+        if dist_writer is not None:
+            dist_writer.write(files)
+        if lite_writer is not None:
+            lite_writer.write(lite_files)
+        spool_fragments(filename, fragments)
+        task = icon_tasks[filename]
+        if profile is not None:
+            profile.add_icon(filename, task.category, task.target, stages)
+        if png_sizes is not None:
+            png_report.add(task.category, *png_sizes)
+
+    if args["compare_rasterizer"]:
+        results = compare_rasterizer(icons)
+        failed = [r for r in results if r[2] > RASTERIZER_MAX_MEAN_DELTA]
+        print(
+            f"Compared {len(results)} icons rendered by {args['rasterizer']} and batik, "
+            f"{len(failed)} differ by more than {RASTERIZER_MAX_MEAN_DELTA} on average"
+        )
+        sys.exit(1 if failed else 0)
+
+    # A full build is written to a staging directory and swapped in for dist/ at the
+    # end, so dist/ stays complete while it runs. --symbols-only updates dist/ in place.
+    staged_dist = None
+    staged_lite = None
+    dist_dir = Path("..") / "dist"
+    lite_dir = None
     if not (args["symbols_only"] or args["create_color_json"]):
-        # clear out dist/ directory
-        clean_dist()
+        # digests of the published files are kept in the cache directory
+        staged_dist = StagedDir(
+            dist_dir, manifest=Path(args["cache_dir"]) / "dist-manifest.json"
+        )
+        if args["lite"] is not None:
+            staged_lite = StagedDir(
+                Path("..") / "dist-lite",
+                manifest=Path(args["cache_dir"]) / "dist-lite-manifest.json",
+            )
+        with timer.stage("prepare"):
+            dist_dir = staged_dist.prepare()
 
-        # Copy source/*.puml files to dist/
-        copy_puml()
+            # Copy source/*.puml files to dist/
+            copy_puml(dist_dir)
+            if staged_lite is not None:
+                lite_dir = staged_lite.prepare()
+                copy_puml(lite_dir)
 
         # Create category directories
         for i in categories:
-            (Path("..") / "dist" / i).mkdir(exist_ok=True)
-
-        # Create PlantUML sprites
-        pool = Pool(processes=multiprocessing.cpu_count())
-        for i in icons:
-            # pass
-            pool.apply_async(worker, args=(i,))
-        pool.close()
-        pool.join()
+            (dist_dir / i).mkdir(exist_ok=True)
+            if lite_dir is not None:
+                (lite_dir / i).mkdir(exist_ok=True)
+
+        # Create PlantUML sprites, the generated files are written to dist/ by a
+        # writer thread while the workers carry on rendering
+        # Longest icons first, from the timings of previous builds or estimates
+        main_cache = make_build_cache(args)
+        history = TimingHistory(Path(args["cache_dir"]) / "timings.json")
+        cached = {
+            str(icon.filename): main_cache is not None
+            and main_cache.has(main_cache.key(icon))
+            for icon in icons
+        }
+        costs = {
+            name: estimate_cost(task, history.seconds, cached[name])
+            for name, task in icon_tasks.items()
+        }
+        # dist-lite/ files have a writer of their own, None without --lite
+        lite_context = nullcontext() if lite_dir is None else WriteBehind(lite_dir)
+        with (
+            timer.stage("icons"),
+            WriteBehind(dist_dir) as dist_writer,
+            lite_context as lite_writer,
+        ):
+            seconds = run_pool(
+                worker,
+                icon_tasks,
+                lambda filename, result: collect(
+                    filename, result, dist_writer, lite_writer
+                ),
+                costs=costs,
+            )
+        # restored icons say nothing about the cost of building them
+        history.update(
+            {name: round(t, 4) for name, t in seconds.items() if not cached[name]}
+        )
 
         # Generate "all.puml" files for each category
-        for i in categories:
-            create_category_all_file(Path("..") / "dist" / i)
+        with timer.stage("all.puml"):
+            all_dirs = {i: (dist_dir / i, args["split_img"]) for i in categories}
+            if lite_dir is not None:
+                all_dirs.update(
+                    {f"lite/{i}": (lite_dir / i, False) for i in categories}
+                )
+            run_pool(create_category_all_file, all_dirs)
+        if lite_dir is not None:
+            # before publish() moves the staging directories
+            lite_lines = IncludeSizeReport(dist_dir, lite_dir).lines()
+    elif args["symbols_only"]:
+        with timer.stage("icons"):
+            run_pool(mermaid_worker, icon_tasks, collect)
 
     if args["create_color_json"]:
         color_map = {}
@@ -1194,90 +1712,119 @@ def main():
         "icons": {},
         "categories": {},
     }
+    # icon name -> (body reference, width, height) in the order added
+    mermaid_icons = {}
+    # symbol -> .puml file, for tools resolving the includes of a diagram
+    symbol_index = SymbolIndex(release_version)
 
     # Group sorted icons by category for O(n) iteration instead of O(categories × icons)
     icons_by_category = defaultdict(list)
     for icon in sorted_icons:
         icons_by_category[icon.category].append(icon)
 
-    for category in categories:
-        if category in ("GroupIcons", "Uncategorized"):
-            pass
-        else:
-            if category == "Groups":
-                markdown.append(f"**{category}** | | | **{category}/all.puml**\n")
-            else:
-                markdown.append(
-                    f"**{category}** | $AWSColor({category}) / {COLOR_MACROS[CATEGORY_COLORS[category]]} | | **{category}/all.puml**\n"
-                )
-        for j in icons_by_category[category]:
-            cat = j.category
-            tgt = j.target
-            skip_icon = j.skip_icon
-            if j.filename_dark is not None:
-                img = f"![{tgt}](dist/{cat}/{tgt}.png?raw=true#gh-light-mode-only)"
-                img = (
-                    img
-                    + f" ![{tgt}](dist/{cat}/{tgt}_Dark.png?raw=true#gh-dark-mode-only)"
-                )
-            else:
-                img = f"![{tgt}](dist/{cat}/{tgt}.png?raw=true)"
-            if cat == "GroupIcons":
+    # Markdown rows, Structurizr elements, symbol index and Mermaid icons for each icon
+    with timer.stage("symbols"):
+        for category in categories:
+            if category in ("GroupIcons", "Uncategorized"):
                 pass
-            elif cat == "Groups":
-                if skip_icon:
-                    markdown.append(f"{cat} | {tgt}Group | - | {cat}/{tgt}.puml\n")
+            else:
+                if category == "Groups":
+                    markdown.append(f"**{category}** | | | **{category}/all.puml**\n")
+                else:
+                    markdown.append(
+                        f"**{category}** | $AWSColor({category}) / {COLOR_MACROS[CATEGORY_COLORS[category]]} | | **{category}/all.puml**\n"
+                    )
+            for j in icons_by_category[category]:
+                cat = j.category
+                tgt = j.target
+                skip_icon = j.skip_icon
+                if j.filename_dark is not None:
+                    img = f"![{tgt}](dist/{cat}/{tgt}.png?raw=true#gh-light-mode-only)"
+                    img = (
+                        img
+                        + f" ![{tgt}](dist/{cat}/{tgt}_Dark.png?raw=true#gh-dark-mode-only)"
+                    )
+                else:
+                    img = f"![{tgt}](dist/{cat}/{tgt}.png?raw=true)"
+                if cat == "GroupIcons":
+                    pass
+                elif cat == "Groups":
+                    if skip_icon:
+                        markdown.append(f"{cat} | {tgt}Group | - | {cat}/{tgt}.puml\n")
+                    else:
+                        markdown.append(
+                            (
+                                f"{cat} | {tgt}Group / ${tgt}IMG() | {img} | {cat}/{tgt}.puml\n"
+                            )
+                        )
                 else:
                     markdown.append(
                         (
-                            f"{cat} | {tgt}Group / ${tgt}IMG() | {img} | {cat}/{tgt}.puml\n"
+                            f"{cat} | {tgt} / {tgt}Participant / ${tgt}IMG() | {img} | {cat}/{tgt}.puml\n"
                         )
                     )
-            else:
-                markdown.append(
-                    (
-                        f"{cat} | {tgt} / {tgt}Participant / ${tgt}IMG() | {img} | {cat}/{tgt}.puml\n"
-                    )
-                )
-
-            # Add element to Structurizr theme
-            element = {"tag": tgt, "stroke": j.color}
-            if j.color == "$AWS_FG_COLOR":
-                element["stroke"] = "#000000"
-            if j.group_border_style in ("dashed", "dotted"):
-                # solid|dashed|dotted
-                element["border"] = j.group_border_style
 
-            if not skip_icon:
-                element["icon"] = f"{cat}/{tgt}.png"
-            structerizr["elements"].append(element)
-
-            # Add element to Mermaid
-            try:
-                svg_filename = re.sub(r"\.png$", ".svg", str(j.filename))
-                if svg_filename.endswith(".svg"):
-                    build_mermaid_icon(mermaid, svg_filename, cat, j.target2)
+                # Add element to Structurizr theme
+                element = {"tag": tgt, "stroke": j.color}
+                if j.color == "$AWS_FG_COLOR":
+                    element["stroke"] = "#000000"
+                if j.group_border_style in ("dashed", "dotted"):
+                    # solid|dashed|dotted
+                    element["border"] = j.group_border_style
+
+                if not skip_icon:
+                    element["icon"] = f"{cat}/{tgt}.png"
+                structerizr["elements"].append(element)
+
+                if cat != "GroupIcons":
+                    symbol_index.add(cat, tgt, j.target2, group=j.group)
+
+                # Add element to Mermaid
+                if str(j.filename) not in mermaid_fragments:
+                    spool_fragments(str(j.filename), j.generate_mermaid())
+                for fragment in mermaid_fragments.pop(str(j.filename)):
+                    build_mermaid_icon(mermaid, mermaid_icons, cat, fragment)
+
+    with timer.stage("write symbols"):
+        with open(Path("..") / "AWSSymbols.md", "w", encoding="utf-8") as f:
+            f.write("".join(markdown))
+        write_structurizr_theme(structerizr, dist_dir)
+        symbol_index.write(dist_dir / SYMBOL_INDEX_FILENAME)
+    with timer.stage("write mermaid"):
+        write_mermaid(
+            mermaid,
+            mermaid_icons,
+            spool,
+            dist_dir,
+            compact=args["mermaid_compact"],
+            precision=args["mermaid_precision"],
+        )
+    spool.close()
 
-                if j.filename_dark is not None:
-                    svg_filename_dark = re.sub(r"\.png$", ".svg", str(j.filename_dark))
-                    if svg_filename_dark.endswith(".svg"):
-                        build_mermaid_icon(
-                            mermaid, svg_filename_dark, cat, f"{j.target2}-dark"
-                        )
+    if staged_dist is not None:
+        with timer.stage("publish"):
+            linked = staged_dist.publish(dist_writer.digests)
+        print(
+            f"Published dist/, {linked} unchanged files linked from the previous build"
+        )
+    if staged_lite is not None:
+        with timer.stage("publish"):
+            linked = staged_lite.publish(lite_writer.digests)
+        print(
+            f"Published dist-lite/, {linked} unchanged files linked from the previous build"
+        )
+        for line in lite_lines:
+            print(line)
 
-            except Exception as e:  # pylint: disable=broad-except
-                print(f"Error: {e} adding {j.target2} to aws-icons-mermaid.json")
+    if args["optimize_png"]:
+        for line in png_report.lines():
+            print(line)
 
-    with open(Path("..") / "AWSSymbols.md", "w", encoding="utf-8") as f:
-        f.write("".join(markdown))
-    with open(
-        Path("..") / "dist" / "aws-icons-structurizr-theme.json", "w", encoding="utf-8"
-    ) as f:
-        f.write(json.dumps(structerizr, indent=2))
-    with open(
-        Path("..") / "dist" / "aws-icons-mermaid.json", "w", encoding="utf-8"
-    ) as f:
-        f.write(json.dumps(mermaid, indent=2))
+    if profile is not None:
+        for line in profile.lines():
+            print(line)
+        profile.write(args["profile"])
+        print(f"Profile written to {args['profile']}")
 
 
 if __name__ == "__main__":
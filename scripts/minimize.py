@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+
+
+"""minimize.py: Replace all.puml includes with the icons a PlantUML diagram uses"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+from typing import List, Optional, Set
+
+import yaml
+from awsicons.symbols import SYMBOL_INDEX_FILENAME, SymbolIndex
+from upgrade import IncludePatternManager
+
+DEFAULT_INDEX = f"../dist/{SYMBOL_INDEX_FILENAME}"
+
+# Same detection of the AWSPuml define as upgrade.py
+AWSPUML_PATTERN = r"!define (.+) https:\/\/raw.githubusercontent.com\/awslabs\/aws-icons-for-plantuml\/(.+)\/dist"
+
+# For any icon look for:
+# - sprite $Icon, <$Icon> or <$Icon{scale=0.5}>
+# - image $IconIMG(
+# - macro Icon(, IconParticipant( or IconGroup(
+# - name passed to a macro, AWSEntity(..., EC2, ...) or $AWSImg(EC2)
+reference_pattern = r"(?P<sprite>\$)?\b(?P<name>[A-Za-z_]\w*)(?P<call>\()?"
+
+
+def referenced_files(line: str, index: SymbolIndex) -> Set[str]:
+    """
+    Returns the .puml paths, relative to dist/, defining the icons referenced in a line
+
+    :param line: line to process
+    :type line: str
+    :param index: symbols of the generated .puml files
+    :type index: SymbolIndex
+    :return: .puml paths
+    :rtype: Set[str]
+    """
+    files = set()
+    # parentheses open before the match, any name in an argument list may be an icon
+    depth = 0
+    position = 0
+    for match in re.finditer(reference_pattern, line):
+        name = match.group("name")
+        start = match.start()
+        depth += line.count("(", position, start) - line.count(")", position, start)
+        position = start
+        if not (match.group("sprite") or match.group("call") or depth > 0):
+            continue
+        path = index.lookup(name)
+        if path is None and match.group("sprite") and name.endswith("IMG"):
+            path = index.lookup(name[: -len("IMG")])
+        if path is not None:
+            files.add(path)
+    return files
+
+
+def process_file(
+    output_file: str, index: SymbolIndex, define: str = "AWSPuml"
+) -> Optional[List[str]]:
+    """
+    Process the PlantUML file
+    Return the lines to be written to the file, or None if there is nothing to change
+
+    :param output_file: The PlantUML file to process
+    :type output_file: str
+    :param index: symbols of the generated .puml files
+    :type index: SymbolIndex
+    :param define: name of the define the includes start with
+    :type define: str
+    :return: The lines to be written to the file
+    :rtype: List[str]
+    """
+    pattern_manager = IncludePatternManager(define)
+    with open(output_file, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+
+    # line number -> category of each all.puml include, and the icons already included
+    all_includes = {}
+    included = set()
+    needed = set()
+    for line_number, line in enumerate(lines, 1):
+        if line.startswith("!define "):
+            match = re.search(AWSPUML_PATTERN, line)
+            if match:
+                if match.group(1) != pattern_manager.include_define:
+                    pattern_manager.include_define = match.group(1)
+                    pattern_manager.update_include_pattern()
+                continue
+        if line.startswith("!include"):
+            match = re.search(pattern_manager.include_pattern, line)
+            if match and match.group("icon") == "all":
+                all_includes[line_number] = match.group("category")
+            elif match:
+                included.add(f"{match.group('category')}/{match.group('icon')}.puml")
+            continue
+        if line.lstrip().startswith("'"):
+            continue
+        needed |= referenced_files(line, index)
+
+    if not all_includes:
+        return None
+    needed -= included
+
+    # Icons go to the include of their category, any others to the first include
+    by_line = {line_number: [] for line_number in all_includes}
+    first = min(all_includes)
+    line_of_category = {}
+    for line_number, category in all_includes.items():
+        line_of_category.setdefault(category, line_number)
+    for path in sorted(needed):
+        category = path.split("/")[0]
+        by_line[line_of_category.get(category, first)].append(path)
+
+    overwrite_lines: List[str] = []
+    for line_number, line in enumerate(lines, 1):
+        if line_number not in all_includes:
+            overwrite_lines.append(line)
+            continue
+        all_path = f"{all_includes[line_number]}/all.puml"
+        replacement = [line.replace(all_path, path) for path in by_line[line_number]]
+        print(f"⏹️  {line_number:>3}: {line}", end="")
+        for new_line in replacement:
+            print(f"🔄 {line_number:>3}: {new_line}", end="")
+        if not replacement:
+            print(f"🔄 {line_number:>3}: removed, no icons of {all_path} used")
+        overwrite_lines.extend(replacement)
+    return overwrite_lines
+
+
+parser = argparse.ArgumentParser(
+    description="Replace AWS Icons for PlantUML all.puml includes with the icons used"
+)
+parser.add_argument(
+    "--overwrite",
+    action="store_true",
+    default=False,
+    help="Overwrite PlantUML file",
+)
+parser.add_argument(
+    "--index",
+    default=DEFAULT_INDEX,
+    help=f"Symbol index written by icon-builder.py (default: {DEFAULT_INDEX})",
+)
+parser.add_argument(
+    "--config",
+    default=None,
+    help="Use the icons of a config.yml instead of the symbol index",
+)
+parser.add_argument(
+    "filename", help='The PlantUML filename or wildcard in quotes (e.g. "*.puml")'
+)
+
+
+def main():
+    args = vars(parser.parse_args())
+    if args["config"] is not None:
+        with open(args["config"], encoding="utf-8") as f:
+            index = SymbolIndex.from_config(yaml.safe_load(f))
+    elif os.path.isfile(args["index"]):
+        index = SymbolIndex.load(args["index"])
+    else:
+        print(
+            f"Symbol index '{args['index']}' not found, build it with icon-builder.py or use --config"
+        )
+        sys.exit(1)
+
+    filename_arg = args["filename"]
+    puml_files = glob.glob(filename_arg)
+    for output_file in puml_files:
+        print(f"processing {output_file} ...")
+        if not os.path.isfile(output_file):
+            print(f"File '{output_file}' not found")
+            continue
+
+        updated_lines = process_file(output_file, index)
+        if updated_lines is None:
+            print("No all.puml includes found")
+        elif args["overwrite"]:
+            with open(output_file, "w", encoding="utf-8") as file:
+                for line in updated_lines:
+                    file.write(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+from benchmark import compare, make_corpus
+
+# pylint: disable=C0116,C0103
+
+BASE_CONFIG = {
+    "Defaults": {"Colors": {"Smile": "#ED7100", "Galaxy": "#8C4FFF"}},
+    "Categories": {
+        "Analytics": {"Color": "Galaxy", "Icons": []},
+        "Compute": {"Color": "Smile", "Icons": []},
+        "Groups": {"Icons": []},
+    },
+}
+
+
+def test_make_corpus(tmp_path):
+    config = make_corpus(tmp_path, 12, BASE_CONFIG)
+
+    official = tmp_path / "source" / "official"
+    assert list(config["Categories"]) == ["Analytics", "Compute"]
+    assert sum(len(c["Icons"]) for c in config["Categories"].values()) == 12
+    # the globs of dir_list in icon-builder.py
+    assert len(list(official.glob("Category-Icons_01302026/*48/*.png"))) == 2
+    services = list(official.glob("Architecture-Service-Icons_01302026/**/*48/*.png"))
+    resources = list(official.glob("Resource-Icons_01302026/*/*.svg"))
+    assert len(services) + len(resources) == 10
+    for service in services:
+        assert service.with_suffix(".svg").exists()
+    entry = config["Categories"]["Compute"]["Icons"][0]
+    assert entry["Target"] == "Compute"
+    assert (official / entry["SourceDir"] / entry["Source"]).exists()
+
+
+def record(icons_per_second, revision="abc"):
+    return {
+        "icons": 100,
+        "tools": "stub",
+        "run": "cold",
+        "icons_per_second": icons_per_second,
+        "revision": revision,
+    }
+
+
+def test_compare():
+    previous = [record(50.0, "old"), record(100.0)]
+    assert compare(record(95.0), previous, 10.0) is None
+    assert compare(record(80.0), previous, 10.0).endswith(
+        "-20.0% against 100.0 icons/s at abc"
+    )
+    assert compare(record(10.0), [], 10.0) is None
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+from types import SimpleNamespace
+
+from awsicons import cache as cache_module
+from awsicons.cache import BUILDER_SOURCES, ICON_ATTRIBUTES, BuildCache, jar_stamps
+
+# pylint: disable=C0116,C0103
+
+
+def make_icon(tmp_path, svg=b"<svg/>", **attributes):
+    source = tmp_path / "Arch_Amazon-EC2_48.svg"
+    source.write_bytes(svg)
+    values = {name: None for name in ICON_ATTRIBUTES}
+    values.update(source_name="Amazon-EC2", category="Compute", target="EC2")
+    values.update(attributes)
+    return SimpleNamespace(filename=str(source), filename_dark=None, **values)
+
+
+def test_store_and_restore(tmp_path):
+    cache = BuildCache(tmp_path / "cache")
+    key = cache.key(make_icon(tmp_path))
+
+    assert cache.restore(key) is None
+    cache.store(key, {"EC2.puml": b"puml", "EC2.png": b"png"})
+    assert cache.restore(key) == ({"EC2.png": b"png", "EC2.puml": b"puml"}, None)
+
+
+def test_store_and_restore_data(tmp_path):
+    cache = BuildCache(tmp_path / "cache")
+    key = cache.key(make_icon(tmp_path))
+
+    cache.store(key, {"EC2.puml": b"puml"}, {"mermaid": [["ec2", "<g/>", 48, 48]]})
+    assert cache.restore(key) == (
+        {"EC2.puml": b"puml"},
+        {"mermaid": [["ec2", "<g/>", 48, 48]]},
+    )
+
+
+def test_key_changes_with_inputs(tmp_path):
+    cache = BuildCache(tmp_path / "cache")
+    key = cache.key(make_icon(tmp_path))
+
+    assert cache.key(make_icon(tmp_path)) == key
+    assert cache.key(make_icon(tmp_path, svg=b"<svg></svg>")) != key
+    assert cache.key(make_icon(tmp_path, color="#ED7100")) != key
+    other_tools = BuildCache(tmp_path / "cache", tool_versions={"plantuml": "new"})
+    assert other_tools.key(make_icon(tmp_path)) != key
+
+
+def test_jar_stamps(tmp_path):
+    lib = tmp_path / "batik" / "lib"
+    lib.mkdir(parents=True)
+    (lib / "batik-all.jar").write_bytes(b"jar")
+    (lib / "README").write_bytes(b"text")
+    stamps = jar_stamps(tmp_path / "batik")
+
+    assert [stamp[0] for stamp in stamps] == [(lib / "batik-all.jar").as_posix()]
+    assert jar_stamps(tmp_path / "missing.jar") == []
+    # same name, other contents
+    (lib / "batik-all.jar").write_bytes(b"new jar")
+    assert jar_stamps(tmp_path / "batik") != stamps
+    assert (
+        BuildCache(
+            tmp_path / "cache", tool_versions={"batik": jar_stamps(tmp_path / "batik")}
+        ).tools_digest
+        != BuildCache(tmp_path / "cache", tool_versions={"batik": stamps}).tools_digest
+    )
+
+
+def test_files_key(tmp_path):
+    cache = BuildCache(tmp_path / "cache")
+    (tmp_path / "EC2.puml").write_text("ec2", encoding="utf-8")
+    (tmp_path / "Lambda.puml").write_text("lambda", encoding="utf-8")
+    files = [tmp_path / "EC2.puml", tmp_path / "Lambda.puml"]
+    key = cache.files_key(files, "all.puml")
+
+    assert cache.files_key(files, "all.puml") == key
+    assert cache.files_key(files[:1], "all.puml") != key
+    assert cache.files_key(files, "other") != key
+    (tmp_path / "Lambda.puml").write_text("lambda2", encoding="utf-8")
+    assert cache.files_key(files, "all.puml") != key
+
+
+def test_has(tmp_path):
+    cache = BuildCache(tmp_path / "cache")
+    key = cache.key(make_icon(tmp_path))
+
+    assert not cache.has(key)
+    cache.store(key, {"EC2.puml": b"puml"})
+    assert cache.has(key)
+
+
+def test_builder_sources():
+    names = {source.name for source in BUILDER_SOURCES}
+    assert {"icon.py", "svg.py", "icon-builder.py"} <= names
+    assert all(source.exists() for source in BUILDER_SOURCES)
+
+
+def test_key_changes_with_builder_sources(tmp_path, monkeypatch):
+    source = tmp_path / "svg.py"
+    source.write_text("version = 1\n", encoding="utf-8")
+    monkeypatch.setattr(cache_module, "BUILDER_SOURCES", [source])
+    icon = make_icon(tmp_path)
+    cache = BuildCache(tmp_path / "cache")
+    key = cache.key(icon)
+    cache.store(key, {"EC2.puml": b"puml"})
+
+    source.write_text("version = 2\n", encoding="utf-8")
+    changed = BuildCache(tmp_path / "cache")
+    assert changed.key(icon) != key
+    assert changed.restore(changed.key(icon)) is None
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+from awsicons.config_index import ConfigIndex
+
+# pylint: disable=C0116,C0103
+
+CONFIG = {
+    "Defaults": {
+        "Colors": {"Smile": "#FF9900", "Galaxy": "#8C4FFF", "Squid": "#232F3E"},
+        "Category": {"Color": "Squid"},
+        "Group": {"BorderStyle": "plain", "Alignment": "left"},
+    },
+    "Categories": {
+        "Compute": {
+            "Color": "Smile",
+            "Icons": [
+                {"Source": "Arch_Amazon-EC2_48.svg", "Target": "EC2"},
+                {"Source": "Arch_Amazon-EC2_48.svg", "Target": "EC2Duplicate"},
+                {
+                    "Source": "Arch_AWS-Batch_48.svg",
+                    "Target": "Batch",
+                    "Color": "#123456",
+                },
+            ],
+        },
+        "Analytics": {
+            "Icons": [
+                {
+                    "Source": "Arch_Amazon-Athena_48.svg",
+                    "Target": "Athena",
+                    "Color": "Galaxy",
+                },
+                {"Source": "Arch_Amazon-EMR_48.svg", "Target": "EMR"},
+            ],
+        },
+    },
+}
+
+
+def test_lookup():
+    index = ConfigIndex(CONFIG)
+
+    assert index.lookup("Compute", "Arch_Amazon-EC2_48.svg")["Target"] == "EC2"
+    assert index.lookup("Analytics", "Arch_Amazon-EC2_48.svg") is None
+    assert index.lookup("Compute", "Arch_Unknown_48.svg") is None
+
+
+def test_color_resolution_order():
+    index = ConfigIndex(CONFIG)
+    compute = CONFIG["Categories"]["Compute"]["Icons"]
+    analytics = CONFIG["Categories"]["Analytics"]["Icons"]
+
+    assert index.color("Compute", compute[2]) == "#123456"
+    assert index.color("Analytics", analytics[0]) == "#8C4FFF"
+    assert index.color("Compute", compute[0]) == "#FF9900"
+    assert index.color("Analytics", analytics[1]) == "#232F3E"
+    assert index.color_name("Unknown") == "$AWS_FG_COLOR"
+
+
+def test_group_value():
+    index = ConfigIndex(CONFIG)
+
+    assert (
+        index.group_value("Alignment", {"Group": {"Alignment": "center"}}) == "center"
+    )
+    assert index.group_value("Alignment", {}) == "left"
+    assert index.group_value("Label", {}) is None
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import base64
+import io
+import subprocess
+
+import pytest
+from awsicons import icon as icon_module
+from awsicons.icon import Icon
+from PIL import Image
+
+# pylint: disable=C0116,C0103
+
+
+def make_icon(dark=False):
+    icon = Icon()
+    icon.target = "EC2"
+    icon.color = "#ED7100"
+    icon.filename_dark = "Arch_Amazon-EC2_48_Dark.svg" if dark else None
+    return icon
+
+
+IMAGES = {"EC2.png": b"light", "EC2_Dark.png": b"dark"}
+
+
+def test_generate_puml_inlines_image():
+    puml = make_icon().generate_puml("sprite $EC2 []\n", IMAGES)
+
+    assert "!function $EC2IMG($scale=1)\n" in puml
+    assert base64.b64encode(b"light").decode() in puml
+    assert "IMGData" not in puml
+
+
+def test_generate_puml_split_img():
+    icon = make_icon(dark=True)
+    puml = icon.generate_puml("sprite $EC2 []\n", IMAGES, split_img=True)
+    img = icon.generate_puml_img(IMAGES)
+
+    assert base64.b64encode(b"light").decode() not in puml
+    assert '!return %call_user_func("$EC2IMGData", $scale)\n' in puml
+    assert '!return "<$EC2{scale="+$scale+"}>"\n' in puml
+    assert "AWSEntityColoring(EC2)\n" in puml
+    assert img.count("!function $EC2IMGData($scale=1)\n") == 1
+    assert base64.b64encode(b"light").decode() in img
+    assert base64.b64encode(b"dark").decode() in img
+    assert '!if %variable_exists("$AWS_DARK")' in img
+
+
+def test_generate_puml_lite():
+    icon = make_icon(dark=True)
+    puml = icon.generate_puml("sprite $EC2 [64x64/8z] {}\n", None, lite=True)
+
+    assert "sprite $EC2 [64x64/8z] {}\n" in puml
+    assert '!return "<$EC2{scale="+$scale+"}>"\n' in puml
+    assert "IMGData" not in puml
+    assert "base64" not in puml
+    assert "!define EC2(e_alias, e_label, e_techn) AWSEntity(" in puml
+    assert "Participant" not in puml
+
+
+@pytest.mark.parametrize(
+    "returncode, stdout", [(1, b""), (1, b"sprite $EC2 [64x64/16z] {}\n"), (0, b"")]
+)
+def test_generate_puml_sprite_encodesprite_fails(monkeypatch, returncode, stdout):
+    monkeypatch.setattr(
+        icon_module,
+        "get_sprite_encoder",
+        lambda: type("Encoder", (), {"available": False})(),
+    )
+    monkeypatch.setattr(
+        subprocess,
+        "run",
+        lambda *a, **k: subprocess.CompletedProcess(
+            a[0], returncode, stdout, b"Unable to access jarfile"
+        ),
+    )
+
+    with pytest.raises(RuntimeError, match="Unable to access jarfile"):
+        make_icon().generate_puml_sprite(b"png")
+
+
+SVG = """<?xml version="1.0" encoding="UTF-8"?>
+<svg width="48px" height="48px" viewBox="0 0 48 48" version="1.1" xmlns="http://www.w3.org/2000/svg">
+    <defs><linearGradient x1="0%" y1="100%" x2="100%" y2="0%" id="linearGradient-1"><stop stop-color="#C8511B" offset="0%"></stop></linearGradient></defs>
+    {groups}
+</svg>
+"""
+# edges on whole pixels at 64x64, so there is no anti-aliasing to round differently
+ALIGNED = '<rect x="9" y="9" width="15" height="15" fill="#ED7100"></rect>'
+ROUND = '<circle cx="24" cy="24" r="10" fill="#232F3E"></circle>'
+RESOURCE = "Icon-Resource/Compute/Res_Amazon-EC2_48"
+CATEGORY = "Icon-Architecture-Category/48/Compute_48"
+
+
+def make_svg_icon(tmp_path, groups, transparency=True, color="#ED7100", dark=False):
+    def write(name):
+        path = tmp_path / name
+        path.write_text(
+            SVG.format(
+                groups="".join(
+                    f'<g id="{gid}" fill="none" fill-rule="evenodd">{body}</g>'
+                    for gid, body in groups
+                )
+            ),
+            encoding="utf-8",
+        )
+        return str(path)
+
+    icon = make_icon()
+    icon.filename = write("Res_Amazon-EC2_48.svg")
+    icon.filename_dark = write("Res_Amazon-EC2_48_Dark.svg") if dark else None
+    icon.source_name = "Res_Amazon-EC2_48.svg"
+    icon.color = color
+    icon.transparency = transparency
+    return icon
+
+
+def rgba(png):
+    return Image.open(io.BytesIO(png)).convert("RGBA").tobytes()
+
+
+def spy_two_renders(monkeypatch, icon):
+    calls = []
+    monkeypatch.setattr(
+        icon,
+        "_render_sprite_and_images",
+        lambda *a: calls.append(a) or ("sprite", {"EC2.png": b"png"}),
+    )
+    return calls
+
+
+@pytest.mark.parametrize("color", ["#ED7100", "#232F3E"])
+def test_composite_matches_two_renders(tmp_path, color):
+    pytest.importorskip("resvg_py")
+    icon = make_svg_icon(tmp_path, [(RESOURCE, ALIGNED)], color=color, dark=True)
+
+    sprite, images = icon.generate_sprite_and_images(64, "resvg")
+    two_sprite, two_images = icon._render_sprite_and_images(64, "resvg")
+
+    assert rgba(sprite) == rgba(two_sprite)
+    assert images == two_images
+    assert set(images) == {"EC2.png", "EC2_Dark.png"}
+
+
+def test_composite_anti_aliased_edges(tmp_path):
+    """Pillow and the rasterizer may round blended edge pixels differently"""
+    pytest.importorskip("resvg_py")
+    icon = make_svg_icon(tmp_path, [(RESOURCE, ROUND)])
+
+    sprite, images = icon.generate_sprite_and_images(64, "resvg")
+    two_sprite, two_images = icon._render_sprite_and_images(64, "resvg")
+
+    assert images == two_images
+    assert max(abs(a - b) for a, b in zip(rgba(sprite), rgba(two_sprite))) <= 1
+
+
+def test_opaque_single_render(tmp_path):
+    pytest.importorskip("resvg_py")
+    icon = make_svg_icon(tmp_path, [(CATEGORY, ROUND)], transparency=False)
+
+    sprite, images = icon.generate_sprite_and_images(64, "resvg")
+    two_sprite, two_images = icon._render_sprite_and_images(64, "resvg")
+
+    assert sprite == images["EC2.png"]
+    assert rgba(sprite) == rgba(two_sprite)
+    assert images == two_images
+
+
+def test_gradient_uses_two_renders(tmp_path, monkeypatch):
+    body = '<rect width="48" height="48" fill="url(#linearGradient-1)"></rect>'
+    icon = make_svg_icon(tmp_path, [(CATEGORY, body)], transparency=False)
+    calls = spy_two_renders(monkeypatch, icon)
+
+    assert icon.generate_sprite_and_images(64, "resvg")[0] == "sprite"
+    assert calls == [(64, "resvg")]
+
+
+def test_several_backgrounds_use_two_renders(tmp_path, monkeypatch):
+    icon = make_svg_icon(tmp_path, [(RESOURCE, ALIGNED), (CATEGORY, ROUND)])
+    calls = spy_two_renders(monkeypatch, icon)
+
+    assert icon.generate_sprite_and_images(64, "resvg")[0] == "sprite"
+    assert calls == [(64, "resvg")]
+
+
+def test_unknown_background_color_uses_two_renders(tmp_path, monkeypatch):
+    pytest.importorskip("resvg_py")
+    icon = make_svg_icon(tmp_path, [(CATEGORY, ALIGNED)], color="$AWS_FG_COLOR")
+    calls = spy_two_renders(monkeypatch, icon)
+
+    assert icon.generate_sprite_and_images(64, "resvg")[0] == "sprite"
+    assert calls == [(64, "resvg")]
+
+
+def test_composite():
+    image = Image.new("RGBA", (2, 1), (0, 0, 0, 0))
+    image.putpixel((1, 0), (237, 113, 0, 255))
+    out = io.BytesIO()
+    image.save(out, "PNG")
+
+    composited = Image.open(io.BytesIO(Icon._composite(out.getvalue(), "white")))
+    assert composited.convert("RGBA").tobytes() == bytes(
+        (255, 255, 255, 255, 237, 113, 0, 255)
+    )
+    assert Icon._composite(out.getvalue(), "$AWS_FG_COLOR") is None
+
+
+def test_png_source_copied_once(tmp_path):
+    path = tmp_path / "Arch_Amazon-EC2_48.png"
+    Image.new("RGB", (64, 64), "#ED7100").save(path)
+    icon = make_icon()
+    icon.filename = str(path)
+    icon.source_name = path.name
+    icon.transparency = False
+
+    sprite, images = icon.generate_sprite_and_images(64, "resvg")
+
+    assert sprite == images["EC2.png"] == path.read_bytes()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import io
+import json
+
+from awsicons.jsonstream import JsonWriter, Spool
+
+# pylint: disable=C0116,C0103
+
+DOCUMENT = {
+    "prefix": "aws",
+    "info": {"name": "AWS Icons", "total": 2, "samples": ["ec2", "lambda"]},
+    "icons": {
+        "ec2": {"body": '<g fill="#ED7100"/>\n', "width": 64},
+        "lambda": {"body": "<path d='M0 0'/>"},
+    },
+    "empty": {},
+    "categories": {"Compute": ["ec2", "lambda"], "None": []},
+}
+
+
+def write_streamed(document, indent=2):
+    f = io.StringIO()
+    writer = JsonWriter(f, indent=indent)
+    writer.begin_object()
+    for key, value in document.items():
+        if isinstance(value, dict):
+            writer.begin_object(key)
+            for name, item in value.items():
+                writer.value(item, name)
+            writer.end()
+        else:
+            writer.value(value, key)
+    writer.end()
+    return f.getvalue()
+
+
+def test_json_writer_matches_json_dumps():
+    assert write_streamed(DOCUMENT) == json.dumps(DOCUMENT, indent=2)
+
+
+def test_json_writer_minified():
+    assert write_streamed(DOCUMENT, indent=None) == json.dumps(
+        DOCUMENT, separators=(",", ":")
+    )
+
+
+def test_json_writer_arrays():
+    f = io.StringIO()
+    writer = JsonWriter(f, indent=2)
+    writer.begin_array()
+    writer.value({"tag": "EC2"})
+    writer.begin_array()
+    writer.end()
+    writer.end()
+    assert f.getvalue() == json.dumps([{"tag": "EC2"}, []], indent=2)
+
+
+def test_spool_round_trip():
+    with Spool() as spool:
+        refs = [spool.add(text) for text in ("<g/>", "", "ünïcode")]
+        assert [spool.read(ref) for ref in reversed(refs)] == ["ünïcode", "", "<g/>"]
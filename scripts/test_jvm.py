@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import io
+import shutil
+import struct
+from pathlib import Path
+
+import pytest
+from awsicons.jvm import BATIK_DIR, RHINO_JAR, DaemonError, JvmDaemon
+from PIL import Image
+
+# pylint: disable=C0116,C0103
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+SVG = b"""<svg width="48" height="48" viewBox="0 0 48 48" xmlns="http://www.w3.org/2000/svg">
+<rect x="9" y="9" width="15" height="15" fill="#ED7100"/></svg>"""
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    """A daemon with Batik on the classpath, skipped without Java or Batik"""
+    if shutil.which("java") is None or not (SCRIPTS_DIR / RHINO_JAR).exists():
+        pytest.skip("java and Batik are required")
+    # the jar paths are relative to scripts/
+    monkeypatch.chdir(SCRIPTS_DIR)
+    jvm = JvmDaemon([f"{BATIK_DIR}/lib/*"])
+    yield jvm
+    jvm.close()
+
+
+def png_size(data):
+    return Image.open(io.BytesIO(data)).size
+
+
+def test_round_trip(daemon):
+    png = daemon.request("rasterize", "32", SVG)
+
+    assert png.startswith(b"\x89PNG")
+    assert png_size(png) == (32, 32)
+
+
+def test_request_many_keeps_order(daemon):
+    sizes = [16, 64, 32, 48] * 8
+    pngs = daemon.request_many([("rasterize", str(size), SVG) for size in sizes])
+
+    assert [png_size(png) for png in pngs] == [(size, size) for size in sizes]
+
+
+def test_error_response_keeps_daemon(daemon):
+    daemon.start()
+    pid = daemon.process.pid
+
+    with pytest.raises(DaemonError, match="unknown command"):
+        daemon.request("nosuchcommand", "field")
+    with pytest.raises(DaemonError):
+        daemon.request("rasterize", "32", b"<svg")
+    # the failed requests are answered in order and the same JVM serves the next one
+    assert png_size(daemon.request("rasterize", "16", SVG)) == (16, 16)
+    assert daemon.process.pid == pid
+
+
+def test_error_in_batch(daemon):
+    with pytest.raises(DaemonError):
+        daemon.request_many(
+            [
+                ("rasterize", "16", SVG),
+                ("rasterize", "16", b"<svg"),
+                ("rasterize", "16", SVG),
+            ]
+        )
+    assert png_size(daemon.request("rasterize", "24", SVG)) == (24, 24)
+
+
+def test_respawn_after_exit(daemon):
+    daemon.start()
+    first = daemon.process
+    first.kill()
+    first.wait()
+
+    assert png_size(daemon.request("rasterize", "16", SVG)) == (16, 16)
+    assert daemon.process.pid != first.pid
+
+
+def test_respawn_after_dying_mid_request(daemon):
+    daemon.start()
+    first = daemon.process
+    # a negative field length is a framing error that ends the daemon
+    first.stdin.write(struct.pack(">ii", 1, -1))
+    first.stdin.flush()
+
+    with pytest.raises(DaemonError, match="exited unexpectedly"):
+        daemon.request("rasterize", "16", SVG)
+    assert daemon.process is None
+    assert png_size(daemon.request("rasterize", "16", SVG)) == (16, 16)
+    assert first.poll() is not None
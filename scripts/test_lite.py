@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import os
+import subprocess
+import sys
+
+import pytest
+from awsicons.lite import IncludeSizeReport, split_lite
+from benchmark import make_workspace
+
+# pylint: disable=C0116,C0103
+
+
+def test_split_lite():
+    dist, lite = split_lite(
+        {"EC2.png": b"png", "EC2.puml": b"full", "EC2.lite.puml": b"lite"}
+    )
+
+    assert dist == {"EC2.png": b"png", "EC2.puml": b"full"}
+    assert lite == {"EC2.puml": b"lite"}
+
+
+def test_include_size_report(tmp_path):
+    dist, lite = tmp_path / "dist", tmp_path / "dist-lite"
+    for root, sizes in (
+        (dist, {"Compute": 400, "Storage": 100}),
+        (lite, {"Compute": 100}),
+    ):
+        for category, size in sizes.items():
+            (root / category).mkdir(parents=True)
+            (root / category / "all.puml").write_bytes(b"x" * size)
+
+    report = IncludeSizeReport(dist, lite)
+
+    assert report.sizes() == {"Compute": (400, 100), "Storage": (100, 0)}
+    lines = report.lines()
+    assert lines[1].split() == ["Compute", "400", "100", "75.0%"]
+    assert lines[-1].split() == ["Total", "500", "100", "80.0%"]
+
+
+def test_lite_with_split_img(tmp_path):
+    """dist-lite/ has no image files, so only dist/ gets allIMG.puml files"""
+    pytest.importorskip("resvg_py")
+    scripts = make_workspace(tmp_path, 40, "stub")
+    env = dict(os.environ)
+    env["PATH"] = f"{scripts.parent / 'bin'}{os.pathsep}{env.get('PATH', '')}"
+    result = subprocess.run(
+        [
+            sys.executable,
+            "icon-builder.py",
+            "--no-cache",
+            "--rasterizer",
+            "resvg",
+            "--sprite-encoder",
+            "native",
+            "--lite",
+            "--split-img",
+        ],
+        cwd=scripts,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        check=False,
+    )
+    assert result.returncode == 0, result.stdout.decode("utf-8")[-2000:]
+
+    dist, lite = scripts.parent / "dist", scripts.parent / "dist-lite"
+    assert list(dist.glob("*/allIMG.puml"))
+    for all_img in dist.glob("*/allIMG.puml"):
+        assert "IMGData" in all_img.read_text(encoding="utf-8")
+    assert not list(lite.glob("*/allIMG.puml"))
+    assert not list(lite.glob("*/*IMG.puml"))
+    for all_puml in lite.glob("*/all.puml"):
+        assert "sprite $" in all_puml.read_text(encoding="utf-8")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import json
+
+import pytest
+from awsicons.mermaid import MermaidShards, SizeReport, round_coordinates
+
+# pylint: disable=C0116,C0103
+
+
+def test_round_coordinates():
+    body = '<path d="M19.123456,11.98765 L39.5,11.25 Z" fill="#ED7100" />'
+    assert (
+        round_coordinates(body)
+        == '<path d="M19.12,11.99 L39.5,11.25 Z" fill="#ED7100" />'
+    )
+
+
+def test_round_coordinates_keeps_numbers_apart():
+    """.5 after 1.25 is a separate number, as is 0 after a rounded -0.001"""
+    body = '<path d="M1.254.5L2-0.001" />'
+    assert round_coordinates(body, 1) == '<path d="M1.3 0.5L2 0" />'
+
+
+def test_round_coordinates_precision_0():
+    body = '<path d="M10.4 20.6L100.2 3.5" />'
+    assert round_coordinates(body, 0) == '<path d="M10 21L100 4" />'
+
+
+def test_round_coordinates_integers_ending_in_0():
+    body = '<path d="M10.001 20.004L99.996 0.001" />'
+    assert round_coordinates(body, 2) == '<path d="M10 20L100 0" />'
+
+
+def test_round_coordinates_negative_precision():
+    with pytest.raises(ValueError):
+        round_coordinates('<path d="M1.5 2.5" />', -1)
+
+
+def test_round_coordinates_only_geometry_attributes():
+    body = '<g id="Icon-1.12345" transform="translate(1.23456 2)"><rect x="0.004" width="48" /></g>'
+    assert round_coordinates(body, 2) == (
+        '<g id="Icon-1.12345" transform="translate(1.23 2)"><rect x="0" width="48" /></g>'
+    )
+
+
+def test_size_report():
+    report = SizeReport()
+    report.add("Compute", '{"ec2":{"body":"<g/>"}}')
+    report.add("Compute", '{"lambda":{"body":"<g/>"}}')
+    report.add("Storage", '{"s3":{"body":"<g/>"}}')
+
+    lines = report.lines(100)
+    assert lines[1].split()[:3] == ["Compute", "2", "49"]
+    assert lines[2].split()[:3] == ["Storage", "1", "22"]
+    assert lines[3].split()[:3] == ["Total", "3", "71"]
+    assert lines[-1] == "aws-icons-mermaid.json: 100 bytes"
+
+
+def test_mermaid_shards(tmp_path):
+    shards = MermaidShards(
+        tmp_path, {"prefix": "aws", "width": 64, "info": {"name": "AWS Icons"}}
+    )
+    shards.add("Compute", "ec2", {"body": "<g/>"})
+    shards.add("Compute", "ec2-copy", {"body": "<g/>"}, parent="ec2")
+    shards.add("Storage", "s3", {"body": "<g/>"}, parent="ec2")
+    shards.close()
+
+    compute = json.loads((tmp_path / "Compute.json").read_text(encoding="utf-8"))
+    assert compute["prefix"] == "aws"
+    assert compute["icons"] == {"ec2": {"body": "<g/>"}}
+    assert compute["aliases"] == {"ec2-copy": {"parent": "ec2"}}
+    assert compute["info"] == {"name": "AWS Icons - Compute", "total": 2}
+    # parent in another shard, written in full
+    storage = json.loads((tmp_path / "Storage.json").read_text(encoding="utf-8"))
+    assert storage["icons"] == {"s3": {"body": "<g/>"}}
+    assert "aliases" not in storage
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["shards"] == {"Compute": "Compute.json", "Storage": "Storage.json"}
+    assert manifest["icons"] == {
+        "ec2": "Compute.json",
+        "ec2-copy": "Compute.json",
+        "s3": "Storage.json",
+    }
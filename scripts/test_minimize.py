@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+from awsicons.symbols import SymbolIndex
+from minimize import process_file, referenced_files
+
+# pylint: disable=C0116,C0103
+
+INDEX = SymbolIndex.from_config(
+    {
+        "Categories": {
+            "Compute": {
+                "Icons": [
+                    {"Target": "EC2", "Target2": "ec2"},
+                    {"Target": "Lambda", "Target2": "lambda"},
+                ]
+            },
+            "Database": {"Icons": [{"Target": "DynamoDB", "Target2": "dynamodb"}]},
+            "Groups": {"Icons": [{"Target": "AWSCloud", "Target2": "aws-cloud"}]},
+        }
+    }
+)
+
+
+def test_referenced_files():
+    line = 'participant "<$Lambda>\\n$DynamoDBIMG()" as l\n'
+    assert referenced_files(line, INDEX) == {
+        "Compute/Lambda.puml",
+        "Database/DynamoDB.puml",
+    }
+
+
+def test_referenced_files_macros():
+    assert referenced_files('EC2(ec2, "EC2", "")\n', INDEX) == {"Compute/EC2.puml"}
+    assert referenced_files('EC2Participant(e, "E", "")\n', INDEX) == {
+        "Compute/EC2.puml"
+    }
+    assert referenced_files("AWSCloudGroup(cloud) {\n", INDEX) == {
+        "Groups/AWSCloud.puml"
+    }
+
+
+def test_referenced_files_arguments():
+    line = 'AWSEntity(e, "Instance", "", AWS_COLOR, EC2, EC2)\n'
+    assert referenced_files(line, INDEX) == {"Compute/EC2.puml"}
+    assert referenced_files('$AWSImg("Lambda")\n', INDEX) == {"Compute/Lambda.puml"}
+    assert referenced_files('rectangle "EC2" as (r)\n', INDEX) == set()
+
+
+def test_referenced_files_plain_text():
+    assert referenced_files('rectangle "EC2 and Lambda" as r\n', INDEX) == set()
+
+
+def test_process_file(tmp_path):
+    diagram = tmp_path / "diagram.puml"
+    diagram.write_text(
+        "@startuml\n"
+        "!define AWSPuml https://raw.githubusercontent.com/awslabs/aws-icons-for-plantuml/v23.0/dist\n"
+        "!include AWSPuml/AWSCommon.puml\n"
+        "!include AWSPuml/Compute/all.puml\n"
+        "!include AWSPuml/Database/all.puml\n"
+        "!include AWSPuml/Groups/AWSCloud.puml\n"
+        "' Lambda(commented, out)\n"
+        "AWSCloudGroup(cloud) {\n"
+        '  Lambda(fn, "Function", "")\n'
+        "}\n"
+        "@enduml\n",
+        encoding="utf-8",
+    )
+
+    lines = process_file(str(diagram), INDEX)
+
+    assert lines[2:5] == [
+        "!include AWSPuml/AWSCommon.puml\n",
+        "!include AWSPuml/Compute/Lambda.puml\n",
+        "!include AWSPuml/Groups/AWSCloud.puml\n",
+    ]
+
+
+def test_process_file_custom_define(tmp_path):
+    diagram = tmp_path / "diagram.puml"
+    diagram.write_text(
+        "!define ICONS https://raw.githubusercontent.com/awslabs/aws-icons-for-plantuml/v23.0/dist\n"
+        "!includeurl ICONS/Compute/all.puml\n"
+        "$EC2IMG()\n",
+        encoding="utf-8",
+    )
+
+    assert (
+        process_file(str(diagram), INDEX)[1] == "!includeurl ICONS/Compute/EC2.puml\n"
+    )
+
+
+def test_process_file_user_define(tmp_path):
+    diagram = tmp_path / "diagram.puml"
+    diagram.write_text(
+        "!define AWSPuml https://raw.githubusercontent.com/awslabs/aws-icons-for-plantuml/v23.0/dist\n"
+        "!include AWSPuml/Database/all.puml\n"
+        '!define MyTable(a) DynamoDB(a, "Table", "")\n'
+        "MyTable(orders)\n",
+        encoding="utf-8",
+    )
+
+    assert process_file(str(diagram), INDEX)[1] == (
+        "!include AWSPuml/Database/DynamoDB.puml\n"
+    )
+
+
+def test_process_file_bare_argument(tmp_path):
+    diagram = tmp_path / "diagram.puml"
+    diagram.write_text(
+        "!include AWSPuml/Compute/all.puml\n"
+        'AWSEntity(e, "Instance", "", AWS_COLOR, EC2, EC2)\n',
+        encoding="utf-8",
+    )
+
+    assert process_file(str(diagram), INDEX)[0] == "!include AWSPuml/Compute/EC2.puml\n"
+
+
+def test_process_file_no_all(tmp_path):
+    diagram = tmp_path / "diagram.puml"
+    diagram.write_text("!include AWSPuml/Compute/EC2.puml\n", encoding="utf-8")
+
+    assert process_file(str(diagram), INDEX) is None
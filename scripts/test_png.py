@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import io
+import struct
+
+from awsicons.png import PngSizeReport, optimize_files, optimize_png
+from PIL import Image, ImageDraw, PngImagePlugin
+
+# pylint: disable=C0116,C0103
+
+
+def make_png(mode="RGBA", **info):
+    image = Image.new(mode, (64, 64), (0, 0, 0, 0) if mode == "RGBA" else "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((8, 8, 40, 40), fill=(237, 113, 0, 255))
+    draw.ellipse((30, 30, 60, 60), fill=(35, 47, 62, 128))
+    out = io.BytesIO()
+    image.save(out, "PNG", compress_level=1, **info)
+    return out.getvalue()
+
+
+def make_batik_png(gamma=45455, srgb=True):
+    """A PNG with the gAMA, cHRM and sRGB chunks Batik writes"""
+    info = PngImagePlugin.PngInfo()
+    info.add(b"gAMA", struct.pack(">I", gamma))
+    info.add(
+        b"cHRM",
+        struct.pack(">8I", 31270, 32900, 64000, 33000, 30000, 60000, 15000, 6000),
+    )
+    if srgb:
+        info.add(b"sRGB", b"\x00")
+    return make_png(pnginfo=info)
+
+
+def pixels(data):
+    return Image.open(io.BytesIO(data)).convert("RGBA").tobytes()
+
+
+def test_optimize_png_is_lossless_and_smaller():
+    data = make_png(exif=b"Exif\x00\x00MM\x00*\x00\x00\x00\x08\x00\x00")
+    optimized = optimize_png(data)
+
+    assert len(optimized) < len(data)
+    assert pixels(optimized) == pixels(data)
+    image = Image.open(io.BytesIO(optimized))
+    assert image.mode == "P"
+    assert "exif" not in image.info
+
+
+def test_optimize_png_batik_srgb_chunks():
+    for data in (make_batik_png(), make_batik_png(srgb=False)):
+        assert "gamma" in Image.open(io.BytesIO(data)).info
+        optimized = optimize_png(data)
+
+        assert len(optimized) < len(data)
+        assert pixels(optimized) == pixels(data)
+        info = Image.open(io.BytesIO(optimized)).info
+        assert "gamma" not in info and "srgb" not in info
+
+
+def test_optimize_png_keeps_other_gamma():
+    data = make_batik_png(gamma=100000, srgb=False)
+    assert optimize_png(data) == data
+
+
+def test_optimize_png_keeps_color_profile():
+    image = Image.new("RGB", (4, 4), "white")
+    out = io.BytesIO()
+    image.save(out, "PNG", icc_profile=b"profile")
+    assert optimize_png(out.getvalue()) == out.getvalue()
+
+
+def test_optimize_files():
+    data = make_png("RGB")
+    files = {"EC2.png": data, "EC2.puml": b"puml"}
+    count, before, after = optimize_files(files)
+
+    assert (count, before) == (1, len(data))
+    assert after == len(files["EC2.png"]) < before
+    assert files["EC2.puml"] == b"puml"
+
+
+def test_png_size_report():
+    report = PngSizeReport()
+    report.add("Compute", 2, 1000, 750)
+    report.add("Storage", 1, 500, 500)
+
+    lines = report.lines()
+    assert lines[1].split() == ["Compute", "2", "1000", "750", "25.0%"]
+    assert lines[2].split() == ["Storage", "1", "500", "500", "0.0%"]
+    assert lines[3].split() == ["Total", "3", "1500", "1250", "16.7%"]
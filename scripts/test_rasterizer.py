@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import io
+
+import pytest
+from awsicons.rasterizer import ResvgRasterizer, pixel_diff
+from PIL import Image
+
+# pylint: disable=C0116,C0103
+
+SVG = b"""<svg xmlns="http://www.w3.org/2000/svg" width="48" height="48" viewBox="0 0 48 48">
+<rect x="12" y="12" width="24" height="24" fill="#FF9900"/>
+</svg>"""
+
+
+def png_bytes(color, size=(64, 64), mode="RGBA"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_pixel_diff_identical():
+    png = png_bytes((255, 153, 0, 255))
+    assert pixel_diff(png, png) == (0, 0.0)
+
+
+def test_pixel_diff_ignores_color_of_transparent_pixels():
+    assert pixel_diff(png_bytes((0, 0, 0, 0)), png_bytes((255, 255, 255, 0))) == (
+        0,
+        0.0,
+    )
+
+
+def test_pixel_diff_reports_max_and_mean():
+    delta, mean_delta = pixel_diff(
+        png_bytes((0, 0, 0, 255)), png_bytes((40, 0, 0, 255))
+    )
+    assert delta == 40
+    assert mean_delta == pytest.approx(10.0)
+
+
+def test_pixel_diff_size_mismatch():
+    assert pixel_diff(png_bytes("white"), png_bytes("white", (48, 48))) == (255, 255.0)
+
+
+def test_resvg_rasterize():
+    pytest.importorskip("resvg_py")
+    png = ResvgRasterizer().rasterize(SVG, 64)
+
+    with Image.open(io.BytesIO(png)) as img:
+        assert img.size == (64, 64)
+        assert img.convert("RGBA").getpixel((32, 32)) == (255, 153, 0, 255)
+        assert img.convert("RGBA").getpixel((2, 2))[3] == 0
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from awsicons.cache import DATA_FILENAME
+from awsicons.scheduler import (
+    CACHED_COST,
+    CHUNK_SIZE,
+    PNG_COST,
+    TOUCH_COST,
+    TimingHistory,
+    estimate_cost,
+    schedule,
+)
+from benchmark import make_workspace
+
+# pylint: disable=C0116,C0103
+
+
+def make_task(filename, filename_dark=None, skip_icon=False):
+    return SimpleNamespace(
+        filename=filename, filename_dark=filename_dark, skip_icon=skip_icon
+    )
+
+
+def test_estimate_cost(tmp_path):
+    small = tmp_path / "Res_Small_48.svg"
+    small.write_text("<svg/>", encoding="utf-8")
+    large = tmp_path / "Res_Large_48.svg"
+    large.write_text("<svg>" + " " * 100000 + "</svg>", encoding="utf-8")
+
+    assert (
+        estimate_cost(make_task("Groups/Generic.touch", skip_icon=True)) == TOUCH_COST
+    )
+    assert estimate_cost(make_task("Arch_EC2_48.png")) == PNG_COST
+    assert estimate_cost(make_task(small), cached=True) == CACHED_COST
+    assert estimate_cost(make_task(large)) > estimate_cost(make_task(small))
+    assert estimate_cost(make_task(small, small)) == 2 * estimate_cost(make_task(small))
+    assert estimate_cost(make_task(small), history={str(small): 3.0}) == 3.0
+
+
+def test_schedule():
+    costs = {"a": 0.5, "b": 0.001, "c": 2.0, "d": 0.002, "e": 0.003}
+    assert schedule(costs, cheap_cost=0.01, chunk_size=2) == [
+        ["c"],
+        ["a"],
+        ["e", "d"],
+        ["b"],
+    ]
+
+
+def test_schedule_chunks_png_copies(tmp_path):
+    svg = tmp_path / "Res_EC2_48.svg"
+    svg.write_text("<svg/>", encoding="utf-8")
+    tasks = {
+        "ec2": make_task(svg),
+        "png1": make_task("Arch_EC2_48.png"),
+        "png2": make_task("Arch_Lambda_48.png"),
+        "png3": make_task("Arch_S3_48.png"),
+    }
+    costs = {name: estimate_cost(task) for name, task in tasks.items()}
+    assert schedule(costs, chunk_size=16) == [["ec2"], ["png1", "png2", "png3"]]
+
+
+def build(scripts):
+    env = dict(os.environ)
+    env["PATH"] = f"{scripts.parent / 'bin'}{os.pathsep}{env.get('PATH', '')}"
+    return subprocess.run(
+        [
+            sys.executable,
+            "icon-builder.py",
+            "--rasterizer",
+            "resvg",
+            "--sprite-encoder",
+            "native",
+        ],
+        cwd=scripts,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        check=False,
+    ).stdout.decode("utf-8")
+
+
+def test_chunk_error_only_fails_its_task(tmp_path):
+    """Cached icons are cheap and run in chunks, a broken entry fails one icon only"""
+    pytest.importorskip("resvg_py")
+    scripts = make_workspace(tmp_path, 40, "stub")
+    build(scripts)
+    dist = scripts.parent / "dist"
+    icons = sorted(dist.glob("*/*.png"))
+    assert len(icons) >= CHUNK_SIZE
+    data_files = sorted((scripts / ".build-cache").glob(f"*/*/{DATA_FILENAME}"))
+    data_files[0].write_text("{broken", encoding="utf-8")
+
+    output = build(scripts)
+
+    errors = [line for line in output.splitlines() if line.startswith("Error:")]
+    assert len(errors) == 1, output[-2000:]
+    assert len(sorted(dist.glob("*/*.png"))) == len(icons) - 1
+
+
+def test_timing_history(tmp_path):
+    path = tmp_path / "cache" / "timings.json"
+    history = TimingHistory(path)
+    assert history.seconds == {}
+
+    history.update({"EC2.svg": 0.5})
+    history.update({"Lambda.svg": 0.25})
+    assert TimingHistory(path).seconds == {"EC2.svg": 0.5, "Lambda.svg": 0.25}
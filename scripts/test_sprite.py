@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import io
+import re
+import shutil
+import subprocess
+import zlib
+from pathlib import Path
+
+import pytest
+from awsicons.jvm import RHINO_JAR
+from awsicons.sprite import PLANTUML_JAR, SPRITE_ALPHABET, SpriteEncoder, encode_sprite
+from PIL import Image
+
+# pylint: disable=C0116,C0103
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DIST = Path(__file__).parent / ".." / "dist"
+SPRITE_PATTERN = r"sprite \$(\w+) \[(\d+)x(\d+)/(\d+)z\] (?:\{\n(.*?)\n\}|(\S+))\n\n"
+
+
+def decode_sprite(text):
+    """Returns (name, width, height, levels, pixel bytes) of a compressed sprite"""
+    match = re.search(SPRITE_PATTERN, text, re.S)
+    encoded = (match.group(5) or match.group(6)).replace("\n", "")
+    # trailing "0" characters are dropped by the encoder
+    encoded += "0" * (-len(encoded) % 4)
+    alphabet = SPRITE_ALPHABET.tobytes().decode()
+    data = bytearray()
+    for i in range(0, len(encoded), 4):
+        value = 0
+        for c in encoded[i : i + 4]:
+            value = (value << 6) | alphabet.index(c)
+        data += value.to_bytes(3, "big")
+    pixels = zlib.decompressobj(-15).decompress(bytes(data))
+    return (
+        match.group(1),
+        int(match.group(2)),
+        int(match.group(3)),
+        int(match.group(4)),
+        pixels,
+    )
+
+
+def png_bytes(color, size=(64, 64), mode="RGB"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_encode_sprite_matches_plantuml_pixels():
+    """EC2.png is copied from the source PNG, so its sprite came from the same pixels"""
+    png = (DIST / "Compute" / "EC2.png").read_bytes()
+    expected = (DIST / "Compute" / "EC2.puml").read_text(encoding="utf-8")
+
+    result = encode_sprite(png, "EC2")
+    assert decode_sprite(result) == decode_sprite(expected)
+
+
+def test_encode_sprite_multiline_layout():
+    png = (DIST / "Compute" / "EC2.png").read_bytes()
+
+    result = encode_sprite(png, "EC2")
+    lines = result.rstrip("\n").splitlines()
+    assert lines[0] == "sprite $EC2 [64x64/16z] {"
+    assert lines[-1] == "}"
+    assert all(len(line) <= 120 for line in lines[1:-1])
+    assert result.endswith("}\n\n")
+
+
+def test_encode_sprite_single_line():
+    result = encode_sprite(png_bytes("white"), "Blank")
+
+    assert re.fullmatch(r"sprite \$Blank \[64x64/16z\] \S+\n\n", result)
+    assert decode_sprite(result)[4] == bytes(64 * 64)
+
+
+def test_encode_sprite_black_is_darkest_level():
+    for level, darkest in (("4z", 3), ("8z", 7), ("16z", 15)):
+        result = encode_sprite(png_bytes("black", (8, 4)), "Black", level)
+        name, width, height, levels, pixels = decode_sprite(result)
+        assert (name, width, height, levels) == ("Black", 8, 4, int(level[:-1]))
+        assert pixels == bytes([darkest]) * 32
+
+
+def test_encode_sprite_ignores_alpha():
+    """PlantUML reads RGB only, a transparent black pixel is still black"""
+    result = encode_sprite(png_bytes((0, 0, 0, 0), mode="RGBA"), "Clear")
+    assert decode_sprite(result)[4] == bytes([15]) * 64 * 64
+
+
+def test_encode_sprite_invalid_level():
+    with pytest.raises(ValueError):
+        encode_sprite(png_bytes("white"), "Blank", "16")
+
+
+@pytest.fixture
+def sprite_encoder(monkeypatch):
+    """The PlantUML daemon, skipped without Java, Batik's Rhino or the PlantUML jar"""
+    if shutil.which("java") is None or not all(
+        (SCRIPTS_DIR / jar).exists() for jar in (RHINO_JAR, PLANTUML_JAR)
+    ):
+        pytest.skip("java, Batik and the PlantUML jar are required")
+    # the jar paths are relative to scripts/
+    monkeypatch.chdir(SCRIPTS_DIR)
+    encoder = SpriteEncoder()
+    yield encoder
+    encoder.close()
+
+
+@pytest.mark.parametrize("level", ["4", "8", "16", "4z", "8z", "16z"])
+def test_sprite_encoder_matches_plantuml_cli(sprite_encoder, tmp_path, level):
+    png = (DIST / "Compute" / "EC2.png").read_bytes()
+    # the command line names the sprite after the file
+    (tmp_path / "EC2.png").write_bytes(png)
+    cli = subprocess.run(
+        [
+            "java",
+            "-jar",
+            "-Djava.awt.headless=true",
+            PLANTUML_JAR,
+            "-encodesprite",
+            level,
+            str(tmp_path / "EC2.png"),
+        ],
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+
+    assert sprite_encoder.encode("EC2", png, level).encode("utf-8") == cli.stdout
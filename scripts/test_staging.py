@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import filecmp
+import os
+
+import pytest
+from awsicons.staging import StagedDir, file_digest
+
+# pylint: disable=C0116,C0103
+
+
+def test_publish_new(tmp_path):
+    staged = StagedDir(tmp_path / "dist")
+    staging = staged.prepare()
+    (staging / "AWSCommon.puml").write_text("common", encoding="utf-8")
+
+    assert staged.publish() == 0
+    assert (tmp_path / "dist" / "AWSCommon.puml").read_text(
+        encoding="utf-8"
+    ) == "common"
+    assert not staging.exists()
+
+
+def test_publish_links_unchanged(tmp_path):
+    dist = tmp_path / "dist"
+    (dist / "Compute").mkdir(parents=True)
+    (dist / "Compute" / "EC2.puml").write_text("ec2", encoding="utf-8")
+    (dist / "Compute" / "Lambda.puml").write_text("lambda", encoding="utf-8")
+    (dist / "Removed.puml").write_text("removed", encoding="utf-8")
+    unchanged_inode = (dist / "Compute" / "EC2.puml").stat().st_ino
+
+    staged = StagedDir(dist)
+    staging = staged.prepare()
+    (staging / "Compute").mkdir()
+    (staging / "Compute" / "EC2.puml").write_text("ec2", encoding="utf-8")
+    (staging / "Compute" / "Lambda.puml").write_text("lambda2", encoding="utf-8")
+    # the published directory is untouched until publish()
+    assert (dist / "Removed.puml").exists()
+
+    assert staged.publish() == 1
+    assert (dist / "Compute" / "EC2.puml").stat().st_ino == unchanged_inode
+    assert (dist / "Compute" / "Lambda.puml").read_text(encoding="utf-8") == "lambda2"
+    assert not (dist / "Removed.puml").exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["dist"]
+
+
+def stage(staged, files):
+    staging = staged.prepare()
+    for name, contents in files.items():
+        (staging / name).parent.mkdir(parents=True, exist_ok=True)
+        (staging / name).write_text(contents, encoding="utf-8")
+    return staging
+
+
+def no_byte_compare(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("published file read")
+
+    monkeypatch.setattr(filecmp, "cmp", fail)
+
+
+def test_publish_manifest_skips_reading_published(tmp_path, monkeypatch):
+    manifest = tmp_path / "cache" / "dist-manifest.json"
+    staged = StagedDir(tmp_path / "dist", manifest=manifest)
+    stage(staged, {"Compute/EC2.puml": "ec2", "Compute/Lambda.puml": "lambda"})
+    assert staged.publish() == 0
+    assert manifest.exists()
+
+    no_byte_compare(monkeypatch)
+    staging = stage(
+        staged, {"Compute/EC2.puml": "ec2", "Compute/Lambda.puml": "lambdb"}
+    )
+    digests = {"Compute/EC2.puml": file_digest(staging / "Compute" / "EC2.puml")}
+    assert staged.publish(digests) == 1
+    assert (tmp_path / "dist" / "Compute" / "Lambda.puml").read_text(
+        encoding="utf-8"
+    ) == "lambdb"
+
+
+def test_publish_manifest_stale(tmp_path):
+    """A published file changed since the manifest was written is compared byte by byte"""
+    staged = StagedDir(tmp_path / "dist", manifest=tmp_path / "manifest.json")
+    stage(staged, {"EC2.puml": "ec2"})
+    staged.publish()
+    published = tmp_path / "dist" / "EC2.puml"
+    published.write_text("ec3", encoding="utf-8")
+    os.utime(published, ns=(0, 0))
+
+    stage(staged, {"EC2.puml": "ec2"})
+    assert staged.publish() == 0
+    assert published.read_text(encoding="utf-8") == "ec2"
+
+
+def test_link_unchanged_skips_other_sizes(tmp_path, monkeypatch):
+    dist = tmp_path / "dist"
+    dist.mkdir()
+    (dist / "EC2.puml").write_text("ec2", encoding="utf-8")
+    staged = StagedDir(dist)
+    stage(staged, {"EC2.puml": "ec2 changed"})
+
+    no_byte_compare(monkeypatch)
+    assert staged.link_unchanged() == 0
+
+
+@pytest.mark.parametrize("manifest", [None, "manifest.json"])
+def test_publish_relinks_unchanged(tmp_path, manifest):
+    staged = StagedDir(
+        tmp_path / "dist", manifest=tmp_path / manifest if manifest else None
+    )
+    stage(staged, {"EC2.puml": "ec2"})
+    staged.publish()
+    inode = (tmp_path / "dist" / "EC2.puml").stat().st_ino
+
+    for _ in range(2):
+        stage(staged, {"EC2.puml": "ec2"})
+        assert staged.publish() == 1
+        assert (tmp_path / "dist" / "EC2.puml").stat().st_ino == inode
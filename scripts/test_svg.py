@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+from awsicons.svg import mermaid_body, parse_svg
+from lxml import etree
+
+# pylint: disable=C0116,C0103
+
+SVG = """<?xml version="1.0" encoding="UTF-8"?>
+<svg width="48px" height="48px" viewBox="0 0 48 48" version="1.1" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">
+    <title>Arch_Amazon-EC2_48</title>
+    <g id="Icon-Architecture/48/Arch_Amazon-EC2_48" fill="none">
+        <rect fill="#ED7100" x="0" y="0" width="48" height="48"></rect>
+    </g>
+</svg>
+"""
+
+
+def test_mermaid_body(tmp_path):
+    svg_file = tmp_path / "Arch_Amazon-EC2_48.svg"
+    svg_file.write_text(SVG, encoding="utf-8")
+
+    body, width, height = mermaid_body(parse_svg(svg_file).getroot())
+    assert (width, height) == (48, 48)
+    assert body == (
+        '<g id="Icon-Architecture/48/Arch_Amazon-EC2_48" fill="none">'
+        '<rect fill="#ED7100" x="0" y="0" width="48" height="48" /></g>'
+    )
+
+
+def test_parse_svg_returns_copies_of_cached_tree(tmp_path):
+    svg_file = tmp_path / "Arch_Amazon-EC2_48.svg"
+    svg_file.write_text(SVG, encoding="utf-8")
+
+    cached = parse_svg(svg_file, copy_tree=False)
+    assert parse_svg(svg_file, copy_tree=False) is cached
+    tree = parse_svg(svg_file)
+    tree.getroot()[1].append(etree.Element("rect"))
+    assert len(cached.getroot()[1]) == 1
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import json
+
+from awsicons.symbols import SymbolIndex
+
+# pylint: disable=C0116,C0103
+
+
+def test_add():
+    index = SymbolIndex("23.0")
+    index.add("Compute", "EC2", "ec2")
+    index.add("Groups", "AWSCloud", "aws-cloud", group=True)
+
+    assert index.lookup("EC2") == "Compute/EC2.puml"
+    assert index.lookup("ec2") == "Compute/EC2.puml"
+    assert index.lookup("EC2Participant") == "Compute/EC2.puml"
+    assert index.lookup("AWSCloudGroup") == "Groups/AWSCloud.puml"
+    assert index.lookup("AWSCloudParticipant") is None
+    assert index.categories == {
+        "Compute": "Compute/all.puml",
+        "Groups": "Groups/all.puml",
+    }
+
+
+def test_first_file_kept():
+    index = SymbolIndex()
+    index.add("Compute", "Lambda", "lambda")
+    index.add("Serverless", "Lambda", "lambda")
+
+    assert index.lookup("Lambda") == "Compute/Lambda.puml"
+
+
+def test_write_load(tmp_path):
+    index = SymbolIndex("23.0")
+    index.add("Compute", "EC2", "ec2")
+    path = tmp_path / "aws-icons-symbols.json"
+    index.write(path)
+
+    assert "\n" not in path.read_text(encoding="utf-8")
+    assert json.loads(path.read_text(encoding="utf-8"))["version"] == "23.0"
+    loaded = SymbolIndex.load(path)
+    assert loaded.as_dict() == index.as_dict()
+
+
+def test_from_config():
+    index = SymbolIndex.from_config(
+        {
+            "Categories": {
+                "Groups": {"Icons": [{"Target": "IoTGreengrass"}]},
+                "InternetOfThings": {
+                    "Icons": [{"Target": "IoTGreengrass", "Target2": "greengrass"}]
+                },
+            }
+        }
+    )
+
+    assert index.lookup("IoTGreengrass") == "Groups/IoTGreengrass.puml"
+    assert index.lookup("IoTGreengrassGroup") == "Groups/IoTGreengrass.puml"
+    assert index.lookup("greengrass") == "InternetOfThings/IoTGreengrass.puml"
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import json
+import subprocess
+import sys
+
+import pytest
+from awsicons.timing import ProfileReport, StageTimer
+
+# pylint: disable=C0116,C0103
+
+
+def test_stage_timer():
+    timer = StageTimer()
+    for _ in range(2):
+        with timer.stage("render"):
+            sum(range(1000))
+
+    assert list(timer.stages) == ["render"]
+    assert timer.stages["render"]["count"] == 2
+    assert timer.stages["render"]["wall"] >= 0
+
+
+def test_stage_timer_disabled():
+    timer = StageTimer(enabled=False)
+    with timer.stage("render"):
+        pass
+    assert timer.stages == {}
+
+
+@pytest.mark.parametrize("children", [True, False])
+def test_stage_timer_children(children):
+    timer = StageTimer(children=children)
+    with timer.stage("icons"):
+        subprocess.run([sys.executable, "-c", "sum(range(10**7))"], check=True)
+
+    assert (timer.stages["icons"]["subprocess_cpu"] > 0.05) == children
+
+
+def stage(wall):
+    return {"wall": wall, "cpu": wall, "subprocess_cpu": 0.0, "count": 1}
+
+
+def test_profile_report(tmp_path):
+    profile = ProfileReport()
+    with profile.timer.stage("icons"):
+        pass
+    profile.add_icon("EC2.svg", "Compute", "EC2", {"render": stage(2.0)})
+    profile.add_icon(
+        "Lambda.svg", "Compute", "Lambda", {"render": stage(1.0), "puml": stage(3.0)}
+    )
+
+    report = profile.as_dict()
+    assert report["icon_stages"]["icon:render"]["wall"] == 3.0
+    assert report["icon_stages"]["icon:render"]["count"] == 2
+    assert report["icons"]["Lambda.svg"]["wall"] == 4.0
+
+    lines = profile.lines(top=1)
+    assert lines[1].split()[0] == "icon:render"
+    assert lines[-1].split() == ["Compute/Lambda", "4.000", "puml"]
+
+    profile.write(tmp_path / "profile.json")
+    written = json.loads((tmp_path / "profile.json").read_text(encoding="utf-8"))
+    assert written["stages"]["icons"]["count"] == 1
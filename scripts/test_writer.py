@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT (For details, see https://github.com/awslabs/aws-icons-for-plantuml/blob/main/LICENSE)
+import hashlib
+
+import pytest
+from awsicons.writer import WriteBehind
+
+# pylint: disable=C0116,C0103
+
+
+def test_write_behind(tmp_path):
+    (tmp_path / "Compute").mkdir()
+    with WriteBehind(tmp_path, max_pending=1) as writer:
+        for i in range(10):
+            writer.write({f"Compute/Icon{i}.puml": str(i).encode()})
+        writer.flush()
+        assert (tmp_path / "Compute" / "Icon9.puml").read_bytes() == b"9"
+    assert len(writer.written) == 10
+    assert (tmp_path / "Compute" / "Icon0.puml").read_bytes() == b"0"
+    assert writer.digests["Compute/Icon0.puml"] == hashlib.sha256(b"0").hexdigest()
+
+
+def test_write_behind_error(tmp_path):
+    writer = WriteBehind(tmp_path, fsync=False)
+    writer.write({"Missing/Icon.puml": b""})
+    writer.write({"Icon.puml": b""})
+    with pytest.raises(FileNotFoundError):
+        writer.close()
+    assert not (tmp_path / "Icon.puml").exists()
@@ -533,10 +533,9 @@ parser.add_argument(
     "filename", help='The PlantUML filename or wildcard in quotes (e.g. "*.puml")'
 )
 
-args = vars(parser.parse_args())
-
 
 def main():
+    args = vars(parser.parse_args())
     overwrite = False
     if args["overwrite"]:
         overwrite = True